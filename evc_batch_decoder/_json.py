@@ -0,0 +1,33 @@
+"""JSON helpers shared by the decoder and the CLI.
+
+orjson is an optional speed-up (the "fast" extra). It is imported on first use, so
+importing this module stays as cheap as importing ``json``.
+"""
+
+from __future__ import annotations
+
+import json
+from functools import lru_cache
+from types import ModuleType
+from typing import Any
+
+
+@lru_cache(maxsize=1)
+def get_orjson() -> ModuleType | None:
+    """Return the orjson module if it is installed."""
+    try:
+        import orjson  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return None
+    return orjson
+
+
+def json_loads(content: str) -> Any:
+    """Parse JSON with orjson when it is installed, falling back to the standard library."""
+    orjson = get_orjson()
+    if orjson is not None:
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            pass  # orjson rejects some valid JSON, such as integers wider than 64 bits
+    return json.loads(content)
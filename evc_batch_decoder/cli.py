@@ -2,17 +2,133 @@
 
 from __future__ import annotations
 
+import binascii
 import json
+import re
 import sys
+from collections.abc import Iterable, Iterator
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, cast
 
 import click
-from rich.console import Console
-from rich.panel import Panel
-from web3 import Web3
 
-from .decoder import EVCBatchDecoder
+from ._json import get_orjson as _get_orjson
+from ._json import json_loads as _json_loads
 
-console = Console()
+if TYPE_CHECKING:
+    from eth_typing import HexStr
+    from hexbytes import HexBytes
+    from requests import Session
+    from rich.console import Console
+    from web3 import Web3
+    from web3.types import TxData
+
+    from .decoder import BatchDecoding, BatchItem, EVCBatchDecoder, TimelockInfo
+
+# web3 (and the decoder, which depends on it) and rich are imported lazily so
+# that --help, --version and shell completion don't pay for loading them.
+
+_HEX_RE = re.compile(r"(?:0[xX])?[0-9a-fA-F]*")
+
+
+@lru_cache(maxsize=1)
+def _get_console() -> Console:
+    """Return the console for status and error messages, creating it on first use.
+
+    It writes to stderr so that piped output (e.g. ``--json-output | jq``) only
+    contains the payload.
+    """
+    from rich.console import Console  # pylint: disable=import-outside-toplevel
+
+    return Console(stderr=True, highlight=False)
+
+
+@lru_cache(maxsize=8)
+def _get_decoder(chain_id: int) -> EVCBatchDecoder:
+    """Return the decoder for a chain, reused across invocations in the same process."""
+    from .decoder import EVCBatchDecoder  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+    return EVCBatchDecoder(chain_id=chain_id)
+
+
+@lru_cache(maxsize=8)
+def _get_session(rpc_url: str) -> Session:  # pylint: disable=unused-argument
+    """Return a pooled HTTP session for an RPC URL, shared by every client for that URL."""
+    import requests  # pylint: disable=import-outside-toplevel
+    from requests.adapters import HTTPAdapter  # pylint: disable=import-outside-toplevel
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _get_web3(rpc_url: str) -> Web3:
+    """Create a Web3 client for the given RPC URL."""
+    from web3 import Web3  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+    # Retries on transient connection errors are handled by the provider's
+    # default exception_retry_configuration.
+    provider = Web3.HTTPProvider(rpc_url, session=_get_session(rpc_url))
+    return Web3(provider)
+
+
+def _dump_json(obj: Any, indent: int = 0) -> bytes:
+    """Serialize as indented JSON, using orjson when it is installed.
+
+    ``indent`` shifts every line after the first, for embedding the result in
+    an enclosing document.
+    """
+    orjson = _get_orjson()
+    encoded = None
+    if orjson is not None:
+        try:
+            encoded = orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS, default=str)
+        except orjson.JSONEncodeError:
+            pass  # e.g. uint256 values beyond orjson's 64-bit integer range
+    if encoded is None:
+        encoded = json.dumps(obj, indent=2, default=str).encode()
+    # JSON strings never contain raw newlines, so this only touches layout
+    return encoded.replace(b"\n", b"\n" + b" " * indent) if indent else encoded
+
+
+def _item_to_dict(item: BatchItem) -> dict[str, Any]:
+    """Convert a batch item to its JSON output representation."""
+    return {
+        "target_contract": item.target_contract,
+        "data": item.data,
+        "value": item.value,
+        "decoded": item.decoded,
+        "nested_batch": _batch_to_dict(item.nested_batch) if item.nested_batch else None,
+    }
+
+
+def _timelock_to_dict(timelock_info: TimelockInfo | None) -> dict[str, Any] | None:
+    """Convert timelock info to its JSON output representation."""
+    return {"delay": timelock_info.delay} if timelock_info else None
+
+
+def _batch_to_dict(batch_decoding: BatchDecoding) -> dict[str, Any]:
+    """Convert a (nested) batch to its JSON output representation."""
+    return {
+        "items": [_item_to_dict(item) for item in batch_decoding.items],
+        "timelock_info": _timelock_to_dict(batch_decoding.timelock_info),
+    }
+
+
+def _iter_json_output(batch_decoding: BatchDecoding, analysis: dict[str, Any]) -> Iterator[bytes]:
+    """Yield the JSON output document one batch item at a time.
+
+    The layout matches serializing the whole result with ``indent=2``, without
+    building the full result in memory first.
+    """
+    yield b'{\n  "batch": {\n    "items": ['
+    for index, item in enumerate(batch_decoding.items):
+        yield (b",\n      " if index else b"\n      ") + _dump_json(_item_to_dict(item), indent=6)
+    yield b"\n    ],\n" if batch_decoding.items else b"],\n"
+    yield b'    "timelock_info": ' + _dump_json(_timelock_to_dict(batch_decoding.timelock_info), indent=4) + b"\n  },\n"
+    yield b'  "analysis": ' + _dump_json(analysis, indent=2) + b"\n}\n"
 
 
 @click.command()
@@ -20,18 +136,20 @@ console = Console()
 @click.option("--file", "-f", type=click.File("r"), help="Read batch data from file")
 @click.option("--json-output", "-j", is_flag=True, help="Output results as JSON")
 @click.option("--readme-format", "-m", is_flag=True, help="Output in README markdown format")
-@click.option("--tx-hash", "-t", help="Load batch data from transaction hash (requires RPC)")
+@click.option("--tx-hash", "-t", multiple=True, help="Load batch data from transaction hash (requires RPC); repeatable")
 @click.option("--rpc-url", "-r", help="RPC URL for loading transaction data and fetching metadata")
 @click.option("--chain-id", "-c", type=int, default=43114, help="Chain ID (default: 43114 for Avalanche)")
+@click.option("--multi", is_flag=True, hidden=True, help="Decode one input per line from stdin")
 @click.version_option()
 def decode_batch(
     batch_data: str | None,
     file: click.File | None,
     json_output: bool,
     readme_format: bool,
-    tx_hash: str | None,
+    tx_hash: tuple[str, ...],
     rpc_url: str | None,
     chain_id: int,
+    multi: bool,
 ) -> None:
     """
     Decode EVC batch transaction data and display human-readable operations.
@@ -52,23 +170,30 @@ def decode_batch(
         # Decode from transaction hash
         evc-decode --tx-hash 0xabc123... --rpc-url https://eth.llamarpc.com
 
+        # Decode several transactions (fetched in one batch request)
+        evc-decode -t 0xabc123... -t 0xdef456... --rpc-url https://eth.llamarpc.com
+
         # Output as JSON
         evc-decode --json-output 0x72e94bf6000000000000000000000000...
     """
+    console = _get_console()
 
-    decoder = EVCBatchDecoder(chain_id=chain_id)
+    try:
+        decoder = _get_decoder(chain_id)
+    except ModuleNotFoundError as e:
+        raise click.ClickException(f"evc-decode: missing required dependency '{e.name}'") from e
 
     # Set up Web3 client if RPC URL provided
     w3_client: Web3 | None = None
     if rpc_url:
         try:
-            w3_client = Web3(Web3.HTTPProvider(rpc_url))
+            w3_client = _get_web3(rpc_url)
             console.print(f"[green]Connected to RPC: {rpc_url}[/green]")
-        except (ConnectionError, ValueError, TypeError, OSError, Exception) as e:  # pylint: disable=broad-exception-caught
+        except Exception as e:  # pylint: disable=broad-exception-caught
             console.print(f"[yellow]Warning: Failed to connect to RPC: {e}[/yellow]")
 
-    # Determine input source
-    input_data = None
+    # Determine input source(s)
+    inputs: Iterable[Any]
 
     if tx_hash:
         if not rpc_url:
@@ -78,10 +203,10 @@ def decode_batch(
             if w3_client is None:
                 console.print("[red]Error: Web3 client not initialized[/red]")
                 sys.exit(1)
-            tx = w3_client.eth.get_transaction(tx_hash)  # type: ignore
-            input_data = tx["input"].hex() if hasattr(tx["input"], "hex") else tx["input"]
-            console.print(f"[green]✓[/green] Loaded transaction data from {tx_hash}")
-        except (ConnectionError, ValueError, KeyError, TypeError, Exception) as e:  # pylint: disable=broad-exception-caught
+            inputs = _fetch_transaction_inputs(w3_client, tx_hash)
+            for loaded_hash in tx_hash:
+                console.print(f"[green]✓[/green] Loaded transaction data from {loaded_hash}")
+        except Exception as e:  # pylint: disable=broad-exception-caught
             console.print(f"[red]Error loading transaction: {e}[/red]")
             sys.exit(1)
 
@@ -89,30 +214,102 @@ def decode_batch(
         try:
             # Click.File objects act like regular file objects
             content = file.read()  # type: ignore
-            # Try to parse as JSON first
-            try:
-                parsed = json.loads(content)
-                input_data = parsed
-            except json.JSONDecodeError:
+            # Sniff the first non-whitespace character so hex dumps skip the JSON parser
+            first_char = next((char for char in content if not char.isspace()), "")
+            input_data: Any = None
+            if first_char in ("{", "[", '"'):
+                try:
+                    input_data = _json_loads(content)
+                except json.JSONDecodeError:
+                    pass
+            if input_data is None:
                 # Treat as raw hex string
                 input_data = content.strip()
-        except (OSError, IOError, UnicodeDecodeError, ValueError, TypeError) as e:
+            inputs = [input_data]
+        except (OSError, ValueError, TypeError) as e:
             console.print(f"[red]Error reading file: {e}[/red]")
             sys.exit(1)
 
     elif batch_data:
-        input_data = batch_data
+        inputs = [batch_data]
+
+    elif multi:
+        # One input per non-empty stdin line, all decoded with the same decoder
+        inputs = (line.strip() for line in sys.stdin if line.strip())
 
     else:
         # Try to read from stdin
-        stdin_data = sys.stdin.read().strip()
+        stdin_data = sys.stdin.buffer.read().strip()
         if stdin_data:
-            input_data = stdin_data
+            inputs = [_parse_stdin_bytes(stdin_data)]
         else:
             console.print("[red]Error: No batch data provided. Use --help for usage information.[/red]")
             sys.exit(1)
 
+    # Keep going past inputs that fail to decode, but report the failure in the exit code
+    failed = False
+    for input_data in inputs:
+        failed |= not _decode_and_print(decoder, input_data, w3_client, json_output, readme_format)
+    if failed:
+        sys.exit(1)
+
+
+def _parse_stdin_bytes(raw: bytes) -> str | bytes:
+    """Turn raw stdin bytes into decoder input.
+
+    Piped hex is ASCII, so it is unhexlified straight into calldata bytes without a
+    round trip through str. JSON, and anything that isn't valid hex, is passed on
+    as text so it gets the usual parsing and error reporting.
+    """
+    if not raw.startswith((b"{", b"[")):
+        try:
+            return binascii.unhexlify(raw[2:] if raw[:2] in (b"0x", b"0X") else raw)
+        except ValueError:
+            pass
+    return raw.decode("utf-8", errors="replace")
+
+
+def _fetch_transaction_inputs(w3_client: Web3, tx_hashes: tuple[str, ...]) -> list[HexBytes]:
+    """Fetch the calldata of each transaction, in a single JSON-RPC batch request when there are several.
+
+    The calldata is returned as raw bytes (HexBytes) so the decoder skips hex parsing.
+    """
+    if len(tx_hashes) == 1:
+        return [w3_client.eth.get_transaction(cast("HexStr", tx_hashes[0]))["input"]]
+
+    with w3_client.batch_requests() as batch:
+        for tx_hash in tx_hashes:
+            batch.add(w3_client.eth.get_transaction(cast("HexStr", tx_hash)))
+        transactions = cast("list[TxData]", batch.execute())
+    return [tx["input"] for tx in transactions]
+
+
+def _validate_input(input_data: Any) -> None:
+    """Reject obviously malformed input before handing it to the decoder."""
+    if isinstance(input_data, dict):
+        if "data" not in input_data:
+            raise ValueError("Dictionary input must contain 'data' field")
+    elif isinstance(input_data, str) and not input_data.startswith(("{", "[")):
+        # bytes.fromhex skips whitespace, so line-wrapped hex (e.g. from --file) is valid input
+        hex_data = "".join(input_data.split())
+        if not _HEX_RE.fullmatch(hex_data):
+            raise ValueError("Input is not hex-encoded calldata")
+        if len(hex_data) - (2 if hex_data[:2] in ("0x", "0X") else 0) < 8:
+            raise ValueError("Data too short to contain function selector")
+
+
+def _decode_and_print(
+    decoder: EVCBatchDecoder, input_data: Any, w3_client: Web3 | None, json_output: bool, readme_format: bool
+) -> bool:
+    """Decode, analyze and print one input. Returns False if it could not be decoded."""
+    # eth_abi is already loaded by the decoder; its decoding errors (truncated or badly
+    # padded calldata) don't derive from ValueError
+    from eth_abi.exceptions import DecodingError  # pylint: disable=import-outside-toplevel
+
+    console = _get_console()
     try:
+        _validate_input(input_data)
+
         # Decode the batch
         console.print("[dim]Decoding batch data...[/dim]")
         batch_decoding = decoder.decode_batch_data(input_data)
@@ -122,45 +319,37 @@ def decode_batch(
         analysis = decoder.analyze_batch(batch_decoding, w3_client)
 
         if json_output:
-            # Output as JSON
-            result = {
-                "batch": {
-                    "items": [
-                        {
-                            "target_contract": item.target_contract,
-                            "data": item.data,
-                            "value": item.value,
-                            "decoded": item.decoded,
-                            "nested_batch": item.nested_batch.__dict__ if item.nested_batch else None,
-                        }
-                        for item in batch_decoding.items
-                    ],
-                    "timelock_info": batch_decoding.timelock_info.__dict__ if batch_decoding.timelock_info else None,
-                },
-                "analysis": analysis,
-            }
-            console.print(json.dumps(result, indent=2, default=str))
+            # Streamed straight to stdout: the payload has no markup for rich to render
+            sys.stdout.flush()
+            for chunk in _iter_json_output(batch_decoding, analysis):
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
         elif readme_format:
             # README markdown format
             readme_output = decoder.format_readme_style(batch_decoding, analysis)
-            console.print(readme_output)
+            # Plain text: markdown link brackets must not be parsed as rich markup
+            click.echo(readme_output)
         else:
             # Pretty formatted output
             console.print()
             decoder.format_output(batch_decoding, analysis)
 
             # Success message
+            from rich.panel import Panel  # pylint: disable=import-outside-toplevel
+
             console.print(
                 Panel.fit("[bold green]✅ Batch decoding completed successfully![/bold green]", border_style="green")
             )
 
-    except (ValueError, TypeError, KeyError, AttributeError) as e:
+    except (ValueError, TypeError, KeyError, AttributeError, DecodingError) as e:
         console.print(f"[red]❌ Error decoding batch: {e}[/red]")
         if "--debug" in sys.argv:
             import traceback  # pylint: disable=import-outside-toplevel
 
             console.print(traceback.format_exc())
-        sys.exit(1)
+        return False
+
+    return True
 
 
 if __name__ == "__main__":
@@ -2,22 +2,359 @@
 
 from __future__ import annotations
 
-import json
+import copy
+import sys
+from collections.abc import Iterator, Mapping, MutableMapping
 from dataclasses import dataclass
-from typing import Any, cast
+from functools import cached_property, lru_cache
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, TypeGuard, cast, overload
 
 import eth_abi
-from eth_abi.exceptions import InsufficientDataBytes
-from rich.console import Console
-from rich.panel import Panel
-from rich.table import Table
-from rich.tree import Tree
-from web3 import Web3
+from eth_abi.decoding import ContextFramesBytesIO
+from eth_abi.exceptions import InsufficientDataBytes, InvalidPointer, NonEmptyPaddingBytes
+from eth_abi.registry import registry as abi_registry
+from eth_typing import ChecksumAddress, HexAddress, HexStr
+from eth_utils.address import to_checksum_address
 
-console = Console()
+from ._json import json_loads as _json_loads
 
+# web3 and Rich are imported where they're used: decoding needs neither, web3 alone takes most
+# of a second to import, and rich.console and rich.markup add about 30ms more
+if TYPE_CHECKING:
+    from rich.console import Console
+    from web3 import AsyncWeb3, Web3
+    from web3.contract import AsyncContract, Contract
 
-@dataclass
+# Options for the module's ``console`` and ``err_console``, created by __getattr__ on first use.
+# Warnings and errors go to stderr so they don't mix with the decoded output. They carry their own
+# markup, so Rich's repr highlighting (a regex pass over every message) is off, as on the CLI's console
+_CONSOLE_OPTIONS: dict[str, dict[str, Any]] = {"console": {}, "err_console": {"stderr": True, "highlight": False}}
+
+
+def __getattr__(name: str) -> Any:  # pylint: disable=invalid-name
+    """Create ``console`` or ``err_console`` the first time it is used."""
+    if name not in _CONSOLE_OPTIONS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from rich.console import Console  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+    new_console = globals()[name] = Console(**_CONSOLE_OPTIONS[name])
+    return new_console
+
+
+def _get_console(name: str) -> Console:
+    """Return the module console ``name`` (including one patched in by tests), creating it if needed."""
+    existing = globals().get(name)
+    return cast("Console", existing if existing is not None else __getattr__(name))
+
+
+def _hex_byte_length(hex_data: str) -> int:
+    """Return the number of bytes in a hex string, with or without a 0x prefix."""
+    return (len(hex_data) - 2 if hex_data[:2] in ("0x", "0X") else len(hex_data)) // 2
+
+
+def _read_word(calldata: bytes, offset: int) -> int:
+    """Read the big-endian 32-byte ABI word at ``offset``."""
+    end = offset + 32
+    if offset < 0 or end > len(calldata):
+        raise InsufficientDataBytes(
+            f"Tried to read 32 bytes at offset {offset}, only got {max(len(calldata) - offset, 0)}"
+        )
+    return int.from_bytes(calldata[offset:end])
+
+
+def _read_address(calldata: bytes, offset: int) -> str:
+    """Read the address held in the ABI word at ``offset``, as lowercase hex like eth_abi returns it."""
+    if offset + 32 > len(calldata):
+        raise InsufficientDataBytes(
+            f"Tried to read 32 bytes at offset {offset}, only got {max(len(calldata) - offset, 0)}"
+        )
+    if any(calldata[offset : offset + 12]):
+        raise NonEmptyPaddingBytes(f"Padding bytes were not empty: {calldata[offset : offset + 12]!r}")
+    return "0x" + calldata[offset + 12 : offset + 32].hex()
+
+
+def _read_pointer(calldata: bytes, head: int, frame_start: int, heads_end: int) -> int:
+    """Resolve the offset held at ``head`` against its enclosing ``frame_start``.
+
+    Like eth_abi, the target must lie past the enclosing head block (which ends at ``heads_end``)
+    and inside the calldata.
+    """
+    target = frame_start + _read_word(calldata, head)
+    if target < heads_end or target >= len(calldata):
+        raise InvalidPointer(f"Invalid pointer at offset {head} in calldata")
+    return target
+
+
+def _read_batch_items(calldata: bytes, start: int = 0) -> list[tuple[str, str, int, bytes]]:
+    """Walk the ABI encoding of a ``(address,address,uint256,bytes)[]`` argument.
+
+    Equivalent to ``eth_abi.decode(["(address,address,uint256,bytes)[]"], calldata[start:])[0]``,
+    including which exception malformed calldata raises, but reads the fixed-size head words
+    directly instead of going through eth_abi's generic decoder stack for every item. The
+    encoding is read in place from ``start`` (just past the selector), so the argument is never
+    copied out of the calldata.
+    """
+    array_start = _read_pointer(calldata, start, start, start + 32)
+    length = _read_word(calldata, array_start)
+    heads_start = array_start + 32
+    heads_end = heads_start + 32 * length
+    # eth_abi checks every item pointer before decoding any item
+    item_starts = [_read_pointer(calldata, head, heads_start, heads_end) for head in range(heads_start, heads_end, 32)]
+
+    items = []
+    for item_start in item_starts:
+        target_contract = _read_address(calldata, item_start)
+        on_behalf_of = _read_address(calldata, item_start + 32)
+        value = _read_word(calldata, item_start + 64)
+        data_start = _read_pointer(calldata, item_start + 96, item_start, item_start + 128) + 32
+        data_end = data_start + _read_word(calldata, data_start - 32)
+        # The payload is zero-padded to a whole number of words, and eth_abi requires that padding
+        padded_end = data_start + -(-(data_end - data_start) // 32) * 32
+        if padded_end > len(calldata):
+            raise InsufficientDataBytes(f"Tried to read {padded_end - data_start} bytes at offset {data_start}")
+        if any(calldata[data_end:padded_end]):
+            raise NonEmptyPaddingBytes(f"Padding bytes were not empty: {calldata[data_end:padded_end]!r}")
+        items.append((target_contract, on_behalf_of, value, calldata[data_start:data_end]))
+    return items
+
+
+def _is_async_web3(w3_client: Web3 | AsyncWeb3[Any]) -> TypeGuard[AsyncWeb3[Any]]:
+    """Tell AsyncWeb3 clients apart without importing web3: if nothing has imported it, no client is an AsyncWeb3."""
+    web3 = sys.modules.get("web3")
+    return web3 is not None and isinstance(w3_client, web3.AsyncWeb3)
+
+
+# Governance setters, grouped by the kind of contract they target
+VAULT_GOVERNANCE_FUNCTIONS = frozenset(
+    {
+        "setCaps",
+        "setGovernorAdmin",
+        "setFeeReceiver",
+        "setInterestRateModel",
+        "setMaxLiquidationDiscount",
+        "setHookConfig",
+        "setInterestFee",
+        "setLiquidationCoolOffTime",
+        "setLTV",
+    }
+)
+ROUTER_GOVERNANCE_FUNCTIONS = frozenset(
+    {
+        "govSetConfig",
+        "transferGovernance",
+        "govSetResolvedVault",
+        "govSetFallbackOracle",
+    }
+)
+GOVERNANCE_FUNCTIONS = VAULT_GOVERNANCE_FUNCTIONS | ROUTER_GOVERNANCE_FUNCTIONS
+
+# Key function signatures for EVC and vault operations, keyed by 0x-prefixed selector.
+# Static: selectors are precomputed, so nothing is hashed at import or decoder creation.
+FUNCTION_SIGNATURES: dict[str, dict[str, Any]] = {
+    # EVC Batch function
+    "0x72e94bf6": {
+        "name": "batch",
+        "inputs": [
+            {
+                "name": "items",
+                "type": "tuple[]",
+                "components": [
+                    {"name": "targetContract", "type": "address"},
+                    {"name": "onBehalfOfAccount", "type": "address"},
+                    {"name": "value", "type": "uint256"},
+                    {"name": "data", "type": "bytes"},
+                ],
+            }
+        ],
+    },
+    "0xc16ae7a4": {
+        "name": "batch",
+        "inputs": [
+            {
+                "name": "items",
+                "type": "tuple[]",
+                "components": [
+                    {"name": "targetContract", "type": "address"},
+                    {"name": "onBehalfOfAccount", "type": "address"},
+                    {"name": "value", "type": "uint256"},
+                    {"name": "data", "type": "bytes"},
+                ],
+            }
+        ],
+    },
+    # Vault governance functions
+    "0x0ac3e318": {
+        "name": "setCaps",
+        "inputs": [{"name": "supplyCap", "type": "uint16"}, {"name": "borrowCap", "type": "uint16"}],
+    },
+    "0xd87f780f": {
+        "name": "setCaps",
+        "inputs": [{"name": "supplyCap", "type": "uint16"}, {"name": "borrowCap", "type": "uint16"}],
+    },
+    "0x8bcd4016": {  # setInterestRateModel
+        "name": "setInterestRateModel",
+        "inputs": [{"name": "newInterestRateModel", "type": "address"}],
+    },
+    "0x8d8fe2c3": {"name": "setGovernorAdmin", "inputs": [{"name": "newGovernorAdmin", "type": "address"}]},
+    "0xefdcd974": {"name": "setFeeReceiver", "inputs": [{"name": "newFeeReceiver", "type": "address"}]},
+    "0xd5a8b4a1": {"name": "setInterestRateModel", "inputs": [{"name": "newModel", "type": "address"}]},
+    "0x0e32cb86": {"name": "setMaxLiquidationDiscount", "inputs": [{"name": "newDiscount", "type": "uint16"}]},
+    "0x7b0472f0": {
+        "name": "setHookConfig",
+        "inputs": [{"name": "newHookTarget", "type": "address"}, {"name": "newHookedOps", "type": "uint32"}],
+    },
+    "0x6a1db1bf": {"name": "setInterestFee", "inputs": [{"name": "newFee", "type": "uint16"}]},
+    "0x7a0a6fdf": {
+        "name": "setLiquidationCoolOffTime",
+        "inputs": [{"name": "newCoolOffTime", "type": "uint16"}],
+    },
+    "0x0f4b509c": {
+        "name": "setLTV",
+        "inputs": [
+            {"name": "collateral", "type": "address"},
+            {"name": "borrowLTV", "type": "uint16"},
+            {"name": "liquidationLTV", "type": "uint16"},
+            {"name": "rampDuration", "type": "uint32"},
+        ],
+    },
+    # Router/Oracle governance functions
+    "0x2c4e0a11": {
+        "name": "govSetConfig",
+        "inputs": [
+            {"name": "base", "type": "address"},
+            {"name": "quote", "type": "address"},
+            {"name": "oracle", "type": "address"},
+        ],
+    },
+    "0x3b9f5da1": {"name": "transferGovernance", "inputs": [{"name": "newGovernor", "type": "address"}]},
+    "0xa5c4b2a3": {
+        "name": "govSetResolvedVault",
+        "inputs": [{"name": "vault", "type": "address"}, {"name": "set", "type": "bool"}],
+    },
+    "0xf3c94c6c": {"name": "govSetFallbackOracle", "inputs": [{"name": "oracle", "type": "address"}]},
+}
+
+# Raw selectors of the EVC batch((address,address,uint256,bytes)[]) function
+BATCH_SELECTORS = frozenset({bytes.fromhex("72e94bf6"), bytes.fromhex("c16ae7a4")})
+
+# Multicall3 is deployed at the same address on every supported chain
+MULTICALL3_ADDRESS = ChecksumAddress(HexAddress(HexStr("0xcA11bde05977b3631167028862bE2a173976CA11")))
+MULTICALL3_ABI: list[dict[str, Any]] = [
+    {
+        "inputs": [
+            {
+                "components": [
+                    {"name": "target", "type": "address"},
+                    {"name": "allowFailure", "type": "bool"},
+                    {"name": "callData", "type": "bytes"},
+                ],
+                "name": "calls",
+                "type": "tuple[]",
+            }
+        ],
+        "name": "aggregate3",
+        "outputs": [
+            {
+                "components": [{"name": "success", "type": "bool"}, {"name": "returnData", "type": "bytes"}],
+                "name": "returnData",
+                "type": "tuple[]",
+            }
+        ],
+        "stateMutability": "view",
+        "type": "function",
+    }
+]
+
+# Function name -> category, so each decoded item is classified with a single lookup
+_VAULT_CATEGORY = 1
+_ROUTER_CATEGORY = 2
+_GOVERNANCE_CATEGORIES = {
+    **dict.fromkeys(VAULT_GOVERNANCE_FUNCTIONS, _VAULT_CATEGORY),
+    **dict.fromkeys(ROUTER_GOVERNANCE_FUNCTIONS, _ROUTER_CATEGORY),
+}
+
+
+def _freeze(value: Any) -> Any:
+    """Read-only copy of a JSON-like signature entry: dicts become mapping proxies, lists tuples."""
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+@lru_cache(maxsize=1)
+def _builtin_signature_entries() -> dict[str, Mapping[str, Any]]:
+    """Frozen entries of the built-in signatures, built once per process and shared by every decoder."""
+    return {selector: _freeze(sig_info) for selector, sig_info in FUNCTION_SIGNATURES.items()}
+
+
+def _index_function_signatures(signatures: Mapping[str, Mapping[str, Any]]) -> dict[bytes, dict[str, Any]]:
+    """Key signatures by their raw 4-byte selector, with the per-input decode metadata precomputed.
+
+    Each input's ``fields`` entry is ``(name, is_address, is_bytes)`` so decoding doesn't
+    repeat the type comparisons for every call. ``decoder`` is the eth_abi tuple decoder for
+    the input types, built on first use so repeated selectors skip eth_abi's per-call
+    validation and registry lookup. ``is_batch`` marks the EVC batch selectors,
+    whose arguments are decoded by ``_decode_batch_function`` rather than here. When
+    ``needs_conversion`` is false no input is an address or bytes, so the decoded values
+    are zipped straight onto ``input_names``.
+    """
+    index = {
+        bytes.fromhex(selector[2:]): {
+            "name": sig_info["name"],
+            "selector": selector,
+            "is_batch": bytes.fromhex(selector[2:]) in BATCH_SELECTORS,
+            "input_types": tuple(inp["type"] for inp in sig_info["inputs"]),
+            "decoder": None,
+            "fields": tuple(
+                (inp["name"], inp["type"] == "address", inp["type"].startswith("bytes")) for inp in sig_info["inputs"]
+            ),
+            "input_names": tuple(inp["name"] for inp in sig_info["inputs"]),
+        }
+        for selector, sig_info in signatures.items()
+    }
+    for entry in index.values():
+        entry["needs_conversion"] = any(is_address or is_bytes for _, is_address, is_bytes in entry["fields"])
+    return index
+
+
+class _SignatureTable(MutableMapping[str, Mapping[str, Any]]):
+    """A decoder's signature table, keyed by lowercase 0x-prefixed selector.
+
+    Assigning or deleting an entry also updates the selector index decoding goes through.
+    Entries are stored read-only, so they are changed by replacing them rather than in place.
+    """
+
+    def __init__(self, entries: dict[str, Mapping[str, Any]], index: dict[bytes, dict[str, Any]]) -> None:
+        self._entries = entries
+        self._index = index
+
+    def __getitem__(self, selector: str) -> Mapping[str, Any]:
+        return self._entries[selector]
+
+    def __setitem__(self, selector: str, sig_info: Mapping[str, Any]) -> None:
+        selector = "0x" + selector.removeprefix("0x").removeprefix("0X").lower()
+        if len(bytes.fromhex(selector[2:])) != 4:
+            raise ValueError(f"Function selector must be 4 bytes: {selector}")
+
+        entry = _freeze({"name": sig_info["name"], "inputs": sig_info["inputs"]})
+        self._index.update(_index_function_signatures({selector: entry}))
+        self._entries[selector] = entry
+
+    def __delitem__(self, selector: str) -> None:
+        del self._entries[selector]
+        del self._index[bytes.fromhex(selector[2:])]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+@dataclass(slots=True)
 class BatchItem:
     """Represents a single item in a batch operation."""
 
@@ -25,18 +362,20 @@ class BatchItem:
     data: str
     value: int = 0
     on_behalf_of: str = "0x0000000000000000000000000000000000000000"
+    # functionName, selector and args, plus raw_data for unknown calls or error when decoding failed.
+    # Kept a plain dict: it is serialized as-is to JSON and built directly by library callers.
     decoded: dict[str, Any] | None = None
     nested_batch: BatchDecoding | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class TimelockInfo:
     """Information about timelock delays."""
 
     delay: int
 
 
-@dataclass
+@dataclass(slots=True)
 class BatchDecoding:
     """Complete batch decoding result."""
 
@@ -44,119 +383,141 @@ class BatchDecoding:
     timelock_info: TimelockInfo | None = None
 
 
+# One line of a report section: (depth, label, value, Rich style for the label). Both the plain
+# text and the Rich terminal report are rendered from these, so the two can't drift apart.
+_ReportLine = tuple[int, str, str | None, str]
+
+_REPORT_TITLE = "🧙‍♂️ EVC Batch Decoder Results"
+_ITEMS_TITLE = "📋 Batch Items"
+_CHANGES_TITLE = "🔧 Configuration Changes"
+_UNKNOWN_TITLE = "❓ Unknown Operations"
+
+
+def _summary_rows(analysis: dict[str, Any]) -> list[tuple[str, str]]:
+    """Return the (metric, value) rows of the batch summary."""
+    return [
+        ("Total Items", str(analysis["total_items"])),
+        ("Governance Operations", str(len(analysis["governance_operations"]))),
+        ("Vault Changes", str(len(analysis["vault_changes"]))),
+        ("Router Changes", str(len(analysis["router_changes"]))),
+        ("Unknown Operations", str(len(analysis["unknown_operations"]))),
+        ("Nested Batches", str(analysis["nested_batches"])),
+    ]
+
+
+def _timelock_text(timelock_info: TimelockInfo) -> str:
+    return f"⏱️  TIMELOCK DELAY: {timelock_info.delay} seconds"
+
+
+def _change_lines(analysis: dict[str, Any]) -> list[_ReportLine]:
+    """Build the configuration changes section, grouped by contract, with a blank line between groups."""
+    lines: list[_ReportLine] = []
+    for title, changes_by_contract in (
+        ("Vault Changes:", analysis["vault_changes"]),
+        ("Router Changes:", analysis["router_changes"]),
+    ):
+        if changes_by_contract:
+            if lines:
+                lines.append((0, "", None, ""))
+            lines.append((0, title, None, "bold"))
+            for contract_addr, changes in changes_by_contract.items():
+                lines.append((1, f"{contract_addr}:", None, "cyan"))
+                for change in changes:
+                    args_str = ", ".join([f"{k}={v}" for k, v in change["args"].items()])
+                    lines.append((2, f"• {change['function']}({args_str})", None, ""))
+    return lines
+
+
+def _unknown_lines(analysis: dict[str, Any]) -> list[_ReportLine]:
+    """Build the unknown operations section."""
+    return [
+        (1, f"Item {op['index']}: {op['selector']} → {op['target']} ({op['data_length']} bytes)", None, "")
+        for op in analysis["unknown_operations"]
+    ]
+
+
+def _plain_line(line: _ReportLine) -> str:
+    """Render a report line as indented plain text."""
+    depth, label, value, _ = line
+    return f"{'  ' * depth}{label}" if value is None else f"{'  ' * depth}{label} {value}"
+
+
+def _markup_line(line: _ReportLine) -> str:
+    """Render a report line as Rich markup, without indentation."""
+    from rich.markup import escape  # pylint: disable=import-outside-toplevel
+
+    _, label, value, style = line
+    text = f"[{style}]{escape(label)}[/{style}]" if style else escape(label)
+    return text if value is None else f"{text} {escape(value)}"
+
+
 class EVCBatchDecoder:
     """Main decoder class for EVC batch operations."""
 
-    def __init__(self, chain_id: int = 43114):  # Default to Avalanche
-        self.w3 = Web3()
+    def __init__(self, chain_id: int = 43114, quiet: bool = False):  # Default to Avalanche
         self.chain_id = chain_id
-        self.function_signatures = self._load_function_signatures()
+        # Library callers decoding many batches can skip rendering warnings they don't show
+        self._quiet = quiet
+        # The editable signature table is created on first use; decoding only needs the index
+        self._function_signatures: _SignatureTable | None = None
+        self._sig_by_bytes = {selector: dict(entry) for selector, entry in self._default_signature_index().items()}
         self.chain_config = self._load_chain_config()
+        # (chain address table, lowercase address -> display name), built on first name lookup
+        self._known_address_names: tuple[dict[str, str], dict[str, str]] | None = None
         self.metadata: dict[str, Any] = {}  # Will be populated dynamically
-        self.governance_functions = {
-            "setCaps",
-            "setGovernorAdmin",
-            "setFeeReceiver",
-            "setInterestRateModel",
-            "setMaxLiquidationDiscount",
-            "setHookConfig",
-            "setInterestFee",
-            "setLiquidationCoolOffTime",
-            "setLTV",
-            "govSetConfig",
-            "transferGovernance",
-            "govSetResolvedVault",
-            "govSetFallbackOracle",
-        }
+        self._short_cache: dict[str, str] = {}
+        # Checksumming hashes the address, and the same handful of vaults recur across items
+        self._checksum_cache: dict[str, ChecksumAddress] = {}
+        # (client, contract) for the last Web3 client used to fetch metadata
+        self._multicall: tuple[Web3 | AsyncWeb3[Any], Contract | AsyncContract] | None = None
+        # Per decoder, so callers can add or remove the function names treated as governance
+        self.governance_functions = set(GOVERNANCE_FUNCTIONS)
+
+    @cached_property
+    def w3(self) -> Web3:
+        """A provider-less Web3 instance, created on first use."""
+        from web3 import Web3  # pylint: disable=import-outside-toplevel
+
+        return Web3()
+
+    def _warn(self, message: str) -> None:
+        """Print a warning or error to stderr unless the decoder is quiet."""
+        if not self._quiet:
+            _get_console("err_console").print(message)
+
+    @property
+    def function_signatures(self) -> MutableMapping[str, Mapping[str, Any]]:
+        """The known signatures, keyed by 0x-prefixed selector.
+
+        Assigning or deleting an entry changes how this decoder decodes calls to that selector.
+        Entries are read-only mappings, so replace an entry (or use ``add_function_signature``)
+        rather than editing it in place.
+        """
+        if self._function_signatures is None:
+            self._function_signatures = _SignatureTable(dict(_builtin_signature_entries()), self._sig_by_bytes)
+        return self._function_signatures
+
+    @function_signatures.setter
+    def function_signatures(self, signatures: Mapping[str, Mapping[str, Any]]) -> None:
+        """Replace the whole table, so only ``signatures`` are decoded."""
+        self._sig_by_bytes.clear()
+        self._function_signatures = _SignatureTable({}, self._sig_by_bytes)
+        self._function_signatures.update(signatures)
+
+    def add_function_signature(self, selector: str, name: str, inputs: list[dict[str, Any]]) -> None:
+        """Add or replace the signature used to decode calls to ``selector`` (e.g. ``"0x0ac3e318"``)."""
+        self.function_signatures[selector] = {"name": name, "inputs": inputs}
 
     def _load_function_signatures(self) -> dict[str, dict[str, Any]]:
         """Load function signatures and ABI information."""
-        # Key function signatures for EVC and vault operations
-        signatures = {
-            # EVC Batch function
-            "0x72e94bf6": {
-                "name": "batch",
-                "inputs": [
-                    {
-                        "name": "items",
-                        "type": "tuple[]",
-                        "components": [
-                            {"name": "targetContract", "type": "address"},
-                            {"name": "onBehalfOfAccount", "type": "address"},
-                            {"name": "value", "type": "uint256"},
-                            {"name": "data", "type": "bytes"},
-                        ],
-                    }
-                ],
-            },
-            "0xc16ae7a4": {
-                "name": "batch",
-                "inputs": [
-                    {
-                        "name": "items",
-                        "type": "tuple[]",
-                        "components": [
-                            {"name": "targetContract", "type": "address"},
-                            {"name": "onBehalfOfAccount", "type": "address"},
-                            {"name": "value", "type": "uint256"},
-                            {"name": "data", "type": "bytes"},
-                        ],
-                    }
-                ],
-            },
-            # Vault governance functions
-            "0x0ac3e318": {
-                "name": "setCaps",
-                "inputs": [{"name": "supplyCap", "type": "uint16"}, {"name": "borrowCap", "type": "uint16"}],
-            },
-            "0xd87f780f": {
-                "name": "setCaps",
-                "inputs": [{"name": "supplyCap", "type": "uint16"}, {"name": "borrowCap", "type": "uint16"}],
-            },
-            "0x8bcd4016": {  # setInterestRateModel
-                "name": "setInterestRateModel",
-                "inputs": [{"name": "newInterestRateModel", "type": "address"}],
-            },
-            "0x8d8fe2c3": {"name": "setGovernorAdmin", "inputs": [{"name": "newGovernorAdmin", "type": "address"}]},
-            "0xefdcd974": {"name": "setFeeReceiver", "inputs": [{"name": "newFeeReceiver", "type": "address"}]},
-            "0xd5a8b4a1": {"name": "setInterestRateModel", "inputs": [{"name": "newModel", "type": "address"}]},
-            "0x0e32cb86": {"name": "setMaxLiquidationDiscount", "inputs": [{"name": "newDiscount", "type": "uint16"}]},
-            "0x7b0472f0": {
-                "name": "setHookConfig",
-                "inputs": [{"name": "newHookTarget", "type": "address"}, {"name": "newHookedOps", "type": "uint32"}],
-            },
-            "0x6a1db1bf": {"name": "setInterestFee", "inputs": [{"name": "newFee", "type": "uint16"}]},
-            "0x7a0a6fdf": {
-                "name": "setLiquidationCoolOffTime",
-                "inputs": [{"name": "newCoolOffTime", "type": "uint16"}],
-            },
-            "0x0f4b509c": {
-                "name": "setLTV",
-                "inputs": [
-                    {"name": "collateral", "type": "address"},
-                    {"name": "borrowLTV", "type": "uint16"},
-                    {"name": "liquidationLTV", "type": "uint16"},
-                    {"name": "rampDuration", "type": "uint32"},
-                ],
-            },
-            # Router/Oracle governance functions
-            "0x2c4e0a11": {
-                "name": "govSetConfig",
-                "inputs": [
-                    {"name": "base", "type": "address"},
-                    {"name": "quote", "type": "address"},
-                    {"name": "oracle", "type": "address"},
-                ],
-            },
-            "0x3b9f5da1": {"name": "transferGovernance", "inputs": [{"name": "newGovernor", "type": "address"}]},
-            "0xa5c4b2a3": {
-                "name": "govSetResolvedVault",
-                "inputs": [{"name": "vault", "type": "address"}, {"name": "set", "type": "bool"}],
-            },
-            "0xf3c94c6c": {"name": "govSetFallbackOracle", "inputs": [{"name": "oracle", "type": "address"}]},
-        }
+        # Deep copy: each decoder owns its entries, so edits to one never reach the shared table
+        return copy.deepcopy(FUNCTION_SIGNATURES)
 
-        return signatures
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def _default_signature_index() -> dict[bytes, dict[str, Any]]:
+        """Index of the built-in signatures, built once per process; each decoder copies its entries."""
+        return _index_function_signatures(FUNCTION_SIGNATURES)
 
     def _load_chain_config(self) -> dict[str, Any]:
         """Load chain-specific configuration including explorer URLs and known addresses."""
@@ -207,18 +568,38 @@ class EVCBatchDecoder:
         normalized_addr = address.lower()
 
         # Check if we have metadata for this address
-        if normalized_addr in self.metadata:
-            metadata = self.metadata[normalized_addr]
-            if "name" in metadata:
-                return str(metadata["name"])
+        metadata = self.metadata.get(normalized_addr)
+        if metadata is not None and "name" in metadata:
+            return str(metadata["name"])
 
         # Check if it's a known system address
-        for addr_name, addr_value in self.chain_config.get("addresses", {}).items():
-            if addr_value.lower() == normalized_addr:
-                return f"EVC {addr_name}"
+        known_name = self._get_known_address_names().get(normalized_addr)
+        if known_name is not None:
+            return known_name
+
+        return self._short_address(address)
 
-        # Return shortened address format (first 4 bytes + last 6 bytes)
-        return f"{address[:6]}...{address[-6:]}" if len(address) >= 12 else address
+    def _short_address(self, address: str) -> str:
+        """Shorten an address to 0xABCD...123456 (first 4 bytes + last 6 bytes), memoized per decoder."""
+        short_addr = self._short_cache.get(address)
+        if short_addr is None:
+            short_addr = f"{address[:6]}...{address[-6:]}" if len(address) >= 12 else address
+            self._short_cache[address] = short_addr
+        return short_addr
+
+    def _get_known_address_names(self) -> dict[str, str]:
+        """Map the chain's lowercase system addresses to their display names.
+
+        The map is rebuilt whenever the address table in ``chain_config`` differs from the one it
+        was built from, so direct edits to the public ``chain_config`` are picked up as well.
+        """
+        addresses = self.chain_config.get("addresses", {})
+        if self._known_address_names is None or addresses != self._known_address_names[0]:
+            known_names: dict[str, str] = {}
+            for addr_name, addr_value in addresses.items():
+                known_names.setdefault(addr_value.lower(), f"EVC {addr_name}")
+            self._known_address_names = (dict(addresses), known_names)
+        return self._known_address_names[1]
 
     def get_contract_link(self, address: str) -> str:
         """Get a markdown link for a contract address."""
@@ -235,258 +616,354 @@ class EVCBatchDecoder:
         self.chain_id = chain_id
         self.chain_config = self._load_chain_config()
 
+    def _fetch_all_metadata(
+        self,
+        vault_addresses: list[str],
+        router_addresses: list[str],
+        oracle_addresses: list[str],
+        w3_client: Web3 | AsyncWeb3[Any] | None = None,
+    ) -> None:
+        """Fetch metadata for every address collected from a batch in at most one RPC round trip.
+
+        Vaults are the only contracts queried on-chain, with a single Multicall3 ``aggregate3``.
+        Routers and oracles get generic names locally, so they add no extra calls. Any on-chain
+        probes added for them belong in that same ``aggregate3`` rather than a call of their own.
+        An AsyncWeb3 client is driven with ``asyncio.run``, which can't run inside an event loop;
+        callers there await aanalyze_batch instead.
+        """
+        if w3_client is not None and _is_async_web3(w3_client):
+            import asyncio  # pylint: disable=import-outside-toplevel
+
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                pass
+            else:
+                raise TypeError(
+                    "analyze_batch can't use an AsyncWeb3 client inside a running event loop; "
+                    "await aanalyze_batch instead"
+                )
+            if vault_addresses:
+                asyncio.run(self.afetch_vault_metadata(vault_addresses, w3_client))
+        elif vault_addresses:
+            self.fetch_vault_metadata(vault_addresses, cast("Web3 | None", w3_client))
+        self._fetch_local_metadata(router_addresses, oracle_addresses, w3_client)
+
+    def _fetch_local_metadata(
+        self, router_addresses: list[str], oracle_addresses: list[str], w3_client: Web3 | AsyncWeb3[Any] | None
+    ) -> None:
+        """Name the routers and oracles collected from a batch; neither needs an RPC call."""
+        if router_addresses:
+            self.fetch_router_metadata(router_addresses, w3_client)
+        if oracle_addresses:
+            self.fetch_oracle_metadata(oracle_addresses, w3_client)
+
+    def _to_checksum_address(self, address: str) -> ChecksumAddress:
+        """Checksum ``address``, memoized per decoder."""
+        checksum_addr = self._checksum_cache.get(address)
+        if checksum_addr is None:
+            checksum_addr = self._checksum_cache[address] = to_checksum_address(address)
+        return checksum_addr
+
+    @overload
+    def _get_multicall(self, w3_client: Web3) -> Contract: ...
+
+    @overload
+    def _get_multicall(self, w3_client: AsyncWeb3[Any]) -> AsyncContract: ...
+
+    def _get_multicall(self, w3_client: Web3 | AsyncWeb3[Any]) -> Contract | AsyncContract:
+        """Return the Multicall3 contract for ``w3_client``, building it only when the client changes."""
+        if self._multicall is None or self._multicall[0] is not w3_client:
+            contract = w3_client.eth.contract(address=MULTICALL3_ADDRESS, abi=MULTICALL3_ABI)
+            self._multicall = (w3_client, contract)
+        return self._multicall[1]
+
     def fetch_vault_metadata(self, vault_addresses: list[str], w3_client: Web3 | None = None) -> None:
         """Fetch metadata for vault addresses using Multicall3 (like TG function from JS)."""
         if not vault_addresses:
             return
 
         if not w3_client:
-            console.print("[yellow]Warning: Web3 client not provided, skipping metadata fetch[/yellow]")
+            self._warn("[yellow]Warning: Web3 client not provided, skipping metadata fetch[/yellow]")
             # Without web3, we can't fetch metadata - just use generic names with first 4 + last 6 bytes
             for address in vault_addresses:
-                # Format: 0xABCD...123456 (first 4 bytes + last 6 bytes)
-                short_addr = f"{address[:6]}...{address[-6:]}" if len(address) >= 12 else address
+                short_addr = self._short_address(address)
                 self.add_contract_metadata(address, {"name": f"EVK Vault {short_addr}", "type": "vault"})
             return
 
         # Use Multicall3 to batch calls efficiently (like the JS implementation)
-        multicall3_addr = w3_client.to_checksum_address("0xca11bde05977b3631167028862be2a173976ca11")
-
-        # Multicall3 ABI
-        multicall3_abi = [
-            {
-                "inputs": [
-                    {
-                        "components": [
-                            {"name": "target", "type": "address"},
-                            {"name": "allowFailure", "type": "bool"},
-                            {"name": "callData", "type": "bytes"},
-                        ],
-                        "name": "calls",
-                        "type": "tuple[]",
-                    }
-                ],
-                "name": "aggregate3",
-                "outputs": [
-                    {
-                        "components": [{"name": "success", "type": "bool"}, {"name": "returnData", "type": "bytes"}],
-                        "name": "returnData",
-                        "type": "tuple[]",
-                    }
-                ],
-                "stateMutability": "view",
-                "type": "function",
-            }
-        ]
-
         try:
-            multicall_contract = w3_client.eth.contract(address=multicall3_addr, abi=multicall3_abi)
+            multicall_contract = self._get_multicall(w3_client)
+            calls = self._vault_multicall_calls(vault_addresses)
+            if calls:
+                self._store_vault_metadata(vault_addresses, multicall_contract.functions.aggregate3(calls).call())
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            self._store_fallback_vault_metadata(vault_addresses, e)
 
-            # Build multicall data for each vault (name + asset calls)
-            calls = []
-            for address in vault_addresses:
-                checksum_addr = w3_client.to_checksum_address(address)
-                # Call 1: name() function (0x06fdde03)
-                calls.append((checksum_addr, True, "0x06fdde03"))
-                # Call 2: asset() function (0x38d52e0f)
-                calls.append((checksum_addr, True, "0x38d52e0f"))
+    async def afetch_vault_metadata(self, vault_addresses: list[str], w3_client: AsyncWeb3[Any]) -> None:
+        """Fetch metadata for vault addresses with an AsyncWeb3 client.
+
+        Same single Multicall3 ``aggregate3`` as fetch_vault_metadata, but awaitable, so callers
+        already running an event loop can fetch for several decoders or chains concurrently.
+        """
+        if not vault_addresses:
+            return
 
+        try:
+            multicall_contract = self._get_multicall(w3_client)
+            calls = self._vault_multicall_calls(vault_addresses)
             if calls:
-                # Execute multicall
-                results = multicall_contract.functions.aggregate3(calls).call()
-
-                # Process results in pairs (name, asset)
-                for i in range(0, len(results), 2):
-                    vault_addr = vault_addresses[i // 2]
-
-                    # Decode name
-                    name_result = results[i]
-
-                    if name_result[0]:  # success
-                        try:
-                            # Decode string result (name)
-                            name_decode_result = eth_abi.decode(  # type: ignore[attr-defined]
-                                ["string"], name_result[1]
-                            )
-                            vault_name = name_decode_result[0]  # pylint: disable=unsubscriptable-object
-                        except (ValueError, TypeError, IndexError, AttributeError):
-                            vault_name = f"EVK Vault {vault_addr[:8]}..."
-                    else:
-                        vault_name = f"EVK Vault {vault_addr[:8]}..."
+                results = await multicall_contract.functions.aggregate3(calls).call()
+                self._store_vault_metadata(vault_addresses, results)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            self._store_fallback_vault_metadata(vault_addresses, e)
+
+    def _vault_multicall_calls(self, vault_addresses: list[str]) -> list[tuple[ChecksumAddress, bool, str]]:
+        """Build the aggregate3 calls for each vault (name + asset calls)."""
+        calls = []
+        for address in vault_addresses:
+            checksum_addr = self._to_checksum_address(address)
+            # Call 1: name() function (0x06fdde03)
+            calls.append((checksum_addr, True, "0x06fdde03"))
+            # Call 2: asset() function (0x38d52e0f)
+            calls.append((checksum_addr, True, "0x38d52e0f"))
+        return calls
+
+    def _store_vault_metadata(self, vault_addresses: list[str], results: list[Any]) -> None:
+        """Store vault names from aggregate3 results, which come in (name, asset) pairs per vault."""
+        for i in range(0, len(results), 2):
+            vault_addr = vault_addresses[i // 2]
+
+            # Decode name
+            name_result = results[i]
+
+            if name_result[0]:  # success
+                try:
+                    # Decode string result (name)
+                    name_decode_result = eth_abi.decode(["string"], name_result[1])  # type: ignore[attr-defined]
+                    vault_name = name_decode_result[0]  # pylint: disable=unsubscriptable-object
+                except (ValueError, TypeError, IndexError, AttributeError):
+                    vault_name = f"EVK Vault {vault_addr[:8]}..."
+            else:
+                vault_name = f"EVK Vault {vault_addr[:8]}..."
 
-                    # Store metadata
-                    self.add_contract_metadata(vault_addr, {"name": vault_name, "type": "vault", "kind": "vault"})
+            # Store metadata
+            self.add_contract_metadata(vault_addr, {"name": vault_name, "type": "vault", "kind": "vault"})
 
-        except (ConnectionError, ValueError, TypeError, AttributeError, Exception) as e:  # pylint: disable=broad-exception-caught
-            console.print(f"[dim]Failed to use Multicall3: {e}[/dim]")
-            # Fallback to generic names
-            for address in vault_addresses:
-                self.add_contract_metadata(address, {"name": f"EVK Vault {address[:8]}...", "type": "vault"})
+    def _store_fallback_vault_metadata(self, vault_addresses: list[str], error: Exception) -> None:
+        """Give vaults generic names after a failed Multicall3 fetch."""
+        self._warn(f"[dim]Failed to use Multicall3: {error}[/dim]")
+        for address in vault_addresses:
+            self.add_contract_metadata(address, {"name": f"EVK Vault {address[:8]}...", "type": "vault"})
 
-    def fetch_router_metadata(self, router_addresses: list[str], w3_client: Web3 | None = None) -> None:
+    def fetch_router_metadata(
+        self, router_addresses: list[str], w3_client: Web3 | AsyncWeb3[Any] | None = None
+    ) -> None:
         """Fetch metadata for router addresses using on-chain calls (like SG function from JS)."""
         if not router_addresses:
             return
 
         if not w3_client:
-            console.print("[yellow]Warning: Web3 client not provided, skipping router metadata fetch[/yellow]")
+            self._warn("[yellow]Warning: Web3 client not provided, skipping router metadata fetch[/yellow]")
 
         # For now, use generic names for routers (could be enhanced with actual contract calls)
         for address in router_addresses:
-            # Format: 0xABCD...123456 (first 4 bytes + last 6 bytes)
-            short_addr = f"{address[:6]}...{address[-6:]}" if len(address) >= 12 else address
+            short_addr = self._short_address(address)
             self.add_contract_metadata(address, {"name": f"Oracle Router {short_addr}", "type": "router"})
 
-    def fetch_oracle_metadata(self, oracle_addresses: list[str], w3_client: Web3 | None = None) -> None:
+    def fetch_oracle_metadata(
+        self, oracle_addresses: list[str], w3_client: Web3 | AsyncWeb3[Any] | None = None
+    ) -> None:
         """Fetch metadata for oracle addresses using on-chain calls (like BG function from JS)."""
         if not oracle_addresses:
             return
 
         if not w3_client:
-            console.print("[yellow]Warning: Web3 client not provided, skipping oracle metadata fetch[/yellow]")
+            self._warn("[yellow]Warning: Web3 client not provided, skipping oracle metadata fetch[/yellow]")
 
         # For now, use generic names for oracles (could be enhanced with actual contract calls)
         for address in oracle_addresses:
-            # Format: 0xABCD...123456 (first 4 bytes + last 6 bytes)
-            short_addr = f"{address[:6]}...{address[-6:]}" if len(address) >= 12 else address
+            short_addr = self._short_address(address)
             self.add_contract_metadata(address, {"name": f"Oracle {short_addr}", "type": "oracle"})
 
-    def decode_batch_data(self, data: str | bytes | dict[str, Any]) -> BatchDecoding:
+    def decode_batch_data(self, data: str | bytes | bytearray | dict[str, Any]) -> BatchDecoding:
         """Decode batch data from various input formats."""
 
-        # Handle different input formats
-        if isinstance(data, dict):
-            if "data" in data:
-                hex_data = data["data"]
-            else:
-                raise ValueError("Dictionary input must contain 'data' field")
-        elif isinstance(data, str):
-            if data.startswith("[") or data.startswith("{"):
-                # JSON input
-                parsed = json.loads(data)
-                hex_data = parsed.get("data", data)
-            else:
-                hex_data = data
+        # Raw calldata (e.g. HexBytes from an RPC transaction) is used as-is
+        if isinstance(data, (bytes, bytearray)):
+            calldata = bytes(data)
         else:
-            hex_data = data.hex() if isinstance(data, bytes) else str(data)
+            # Handle different input formats
+            if isinstance(data, dict):
+                if "data" in data:
+                    hex_data = data["data"]
+                else:
+                    raise ValueError("Dictionary input must contain 'data' field")
+            elif isinstance(data, str):
+                if data.startswith(("[", "{")):
+                    # JSON input
+                    parsed = _json_loads(data)
+                    hex_data = parsed.get("data", data)
+                else:
+                    hex_data = data
+            else:
+                hex_data = str(data)
 
-        # Ensure hex format
-        if not hex_data.startswith("0x"):
-            hex_data = "0x" + hex_data
+            # Strip hex prefix
+            if hex_data[:2] in ("0x", "0X"):
+                hex_data = hex_data[2:]
 
-        hex_data = hex_data.lower()
+            # Extract function selector
+            if len(hex_data) < 8:
+                raise ValueError("Data too short to contain function selector")
 
-        # Extract function selector
-        if len(hex_data) < 10:
-            raise ValueError("Data too short to contain function selector")
+            calldata = bytes.fromhex(hex_data)
 
-        selector = hex_data[:10]
-        calldata = hex_data[10:]
+        if len(calldata) < 4:
+            raise ValueError("Data too short to contain function selector")
 
         # Check if this is a batch function call
-        if selector in ["0x72e94bf6", "0xc16ae7a4"]:  # batch function
+        if calldata[:4] in BATCH_SELECTORS:
             return self._decode_batch_function(calldata)
         else:
             # Single function call - wrap it in a batch structure
-            return self._decode_single_function(hex_data)
+            return self._decode_single_function(calldata)
 
-    def _decode_batch_function(self, calldata: str) -> BatchDecoding:
-        """Decode the batch function calldata."""
+    def _decode_batch_function(self, calldata: bytes) -> BatchDecoding:
+        """Decode the batch function calldata, selector included.
+
+        Nested batches are decoded from an explicit work list rather than by recursion, so
+        deeply nested batches cost no extra Python frames and can't hit the recursion limit.
+        """
+        pending: list[tuple[BatchItem, bytes]] = []
         try:
-            # Decode the batch items array
-            calldata_bytes = bytes.fromhex(calldata)
+            batch_decoding = self._decode_batch_items(calldata, pending)
+        except (ValueError, TypeError, IndexError, AttributeError) as e:
+            self._warn(f"[red]Error decoding batch function: {e}[/red]")
+            raise
 
-            # The batch function takes an array of structs
-            # Each struct has: (address targetContract, address onBehalfOfAccount, uint256 value, bytes data)
-            decoded_result = eth_abi.decode(  # type: ignore[attr-defined]
-                ["(address,address,uint256,bytes)[]"], calldata_bytes
+        while pending:
+            batch_item, data = pending.pop()
+            try:
+                batch_item.nested_batch = self._decode_batch_items(data, pending)
+            except (ValueError, TypeError, IndexError, AttributeError) as e:
+                self._warn(f"[yellow]Warning: Failed to decode nested batch: {e}[/yellow]")
+
+        return batch_decoding
+
+    def _decode_batch_items(self, calldata: bytes, pending: list[tuple[BatchItem, bytes]]) -> BatchDecoding:
+        """Decode one level of batch calldata, queueing nested batch items on ``pending``."""
+        # The batch function takes an array of structs
+        # Each struct has: (address targetContract, address onBehalfOfAccount, uint256 value, bytes data)
+        items = []
+        for target_contract, on_behalf_of, value, data in _read_batch_items(calldata, 4):
+            data_hex = data.hex()
+
+            batch_item = BatchItem(
+                target_contract=target_contract, data=data_hex, value=value, on_behalf_of=on_behalf_of
             )
-            decoded_data = decoded_result[0]  # pylint: disable=unsubscriptable-object
-
-            items = []
-            for item_data in decoded_data:  # pylint: disable=not-an-iterable
-                target_contract, on_behalf_of, value, data = item_data
-
-                batch_item = BatchItem(
-                    target_contract=target_contract, data=data.hex(), value=value, on_behalf_of=on_behalf_of
-                )
-
-                # Try to decode the function call in the data
-                if len(data) >= 4:
-                    batch_item.decoded = self._decode_function_call(data)
 
-                    # Check for nested batch calls
-                    if batch_item.decoded and batch_item.decoded.get("functionName") == "batch":
-                        try:
-                            nested_batch = self._decode_batch_function(data[4:].hex())
-                            batch_item.nested_batch = nested_batch
-                        except (ValueError, TypeError, IndexError, AttributeError) as e:
-                            console.print(f"[yellow]Warning: Failed to decode nested batch: {e}[/yellow]")
+            # Try to decode the function call in the data
+            if len(data) >= 4:
+                batch_item.decoded = self._decode_function_call(data, data_hex)
 
-                items.append(batch_item)
+                # Nested batch calls are decoded by the caller
+                if batch_item.decoded and batch_item.decoded.get("functionName") == "batch":
+                    pending.append((batch_item, data))
 
-            return BatchDecoding(items=items)
+            items.append(batch_item)
 
-        except (ValueError, TypeError, IndexError, AttributeError) as e:
-            console.print(f"[red]Error decoding batch function: {e}[/red]")
-            raise
+        return BatchDecoding(items=items)
 
-    def _decode_single_function(self, hex_data: str) -> BatchDecoding:
+    def _decode_single_function(self, calldata: bytes) -> BatchDecoding:
         """Decode a single function call and wrap it in batch structure."""
-        data_bytes = bytes.fromhex(hex_data[2:])  # Remove 0x prefix
-
+        calldata_hex = calldata.hex()
         batch_item = BatchItem(
             target_contract="0x0000000000000000000000000000000000000000",  # Unknown
-            data=hex_data,
+            data="0x" + calldata_hex,
             value=0,
         )
 
-        batch_item.decoded = self._decode_function_call(data_bytes)
+        batch_item.decoded = self._decode_function_call(calldata, calldata_hex)
 
         return BatchDecoding(items=[batch_item])
 
-    def _decode_function_call(self, data: bytes) -> dict[str, Any] | None:
-        """Decode a function call from its calldata."""
+    def _decode_function_call(self, data: bytes, data_hex: str | None = None) -> dict[str, Any] | None:
+        """Decode a function call from its calldata.
+
+        ``data_hex`` is ``data.hex()`` when the caller already has it, so unknown calls
+        don't hex-encode their payload a second time for ``raw_data``.
+        """
         if len(data) < 4:
             return None
 
-        selector = data[:4].hex()
-        selector_with_prefix = "0x" + selector
+        sig_info = self._sig_by_bytes.get(data[:4])
+        if sig_info is None:
+            return {
+                "functionName": "unknown",
+                "selector": "0x" + data[:4].hex(),
+                "args": {},
+                "raw_data": data.hex() if data_hex is None else data_hex,
+            }
 
-        if selector_with_prefix in self.function_signatures:
-            sig_info = self.function_signatures[selector_with_prefix]
-            function_name = sig_info["name"]
-            inputs = sig_info["inputs"]
+        function_name = sig_info["name"]
+        selector = sig_info["selector"]
+        input_types = sig_info["input_types"]
 
-            try:
-                # Decode the function arguments
-                if inputs:
-                    input_types = [inp["type"] for inp in inputs]
-                    decoded_args = eth_abi.decode(input_types, data[4:])  # type: ignore[attr-defined]
-
-                    # Create args dictionary
-                    args = {}
-                    for i, inp in enumerate(inputs):
-                        value = decoded_args[i]  # pylint: disable=unsubscriptable-object
+        # Nested batch items are decoded once, by the caller, into a nested BatchDecoding
+        if sig_info["is_batch"]:
+            return {"functionName": function_name, "selector": selector, "args": {}}
+
+        try:
+            # Decode the function arguments
+            args = {}
+            if input_types:
+                tuple_decoder = sig_info["decoder"]
+                if tuple_decoder is None:
+                    tuple_decoder = sig_info["decoder"] = abi_registry.get_tuple_decoder(*input_types)
+                decoded_args = tuple_decoder(ContextFramesBytesIO(data[4:]))  # type: ignore[no-untyped-call]
+
+                if not sig_info["needs_conversion"]:
+                    args = dict(zip(sig_info["input_names"], decoded_args, strict=True))
+                else:
+                    for (name, is_address, is_bytes), value in zip(sig_info["fields"], decoded_args, strict=True):
                         # Convert bytes to hex string for addresses and bytes
-                        if inp["type"] == "address":
-                            value = Web3.to_checksum_address(value)
-                        elif inp["type"].startswith("bytes"):
+                        if is_address:
+                            value = self._to_checksum_address(value)
+                        elif is_bytes:
                             value = value.hex() if isinstance(value, bytes) else value
-                        args[inp["name"]] = value
-                else:
-                    args = {}
+                        args[name] = value
 
-                return {"functionName": function_name, "selector": selector_with_prefix, "args": args}
+            return {"functionName": function_name, "selector": selector, "args": args}
 
-            except (ValueError, TypeError, IndexError, AttributeError, InsufficientDataBytes) as e:
-                console.print(f"[yellow]Warning: Failed to decode function {function_name}: {e}[/yellow]")
-                return {"functionName": function_name, "selector": selector_with_prefix, "args": {}, "error": str(e)}
-        else:
-            return {"functionName": "unknown", "selector": selector_with_prefix, "args": {}, "raw_data": data.hex()}
+        except (ValueError, TypeError, IndexError, AttributeError, InsufficientDataBytes) as e:
+            self._warn(f"[yellow]Warning: Failed to decode function {function_name}: {e}[/yellow]")
+            return {"functionName": function_name, "selector": selector, "args": {}, "error": str(e)}
 
-    def analyze_batch(self, batch_decoding: BatchDecoding, w3_client: Web3 | None = None) -> dict[str, Any]:
+    def analyze_batch(
+        self, batch_decoding: BatchDecoding, w3_client: Web3 | AsyncWeb3[Any] | None = None
+    ) -> dict[str, Any]:
         """Analyze the batch for governance operations and generate insights."""
+        analysis, vault_addresses, router_addresses, oracle_addresses = self._collect_batch_analysis(batch_decoding)
+
+        # Fetch metadata for collected addresses (like the JavaScript version)
+        self._fetch_all_metadata(vault_addresses, router_addresses, oracle_addresses, w3_client)
+
+        return analysis
+
+    async def aanalyze_batch(self, batch_decoding: BatchDecoding, w3_client: AsyncWeb3[Any]) -> dict[str, Any]:
+        """Analyze the batch like analyze_batch, awaiting vault metadata from an AsyncWeb3 client."""
+        analysis, vault_addresses, router_addresses, oracle_addresses = self._collect_batch_analysis(batch_decoding)
+
+        await self.afetch_vault_metadata(vault_addresses, w3_client)
+        self._fetch_local_metadata(router_addresses, oracle_addresses, w3_client)
+
+        return analysis
+
+    def _collect_batch_analysis(
+        self, batch_decoding: BatchDecoding
+    ) -> tuple[dict[str, Any], list[str], list[str], list[str]]:
+        """Build the analysis of a batch, plus the vault, router and oracle addresses needing metadata."""
         analysis: dict[str, Any] = {
             "total_items": len(batch_decoding.items),
             "governance_operations": [],
@@ -496,120 +973,74 @@ class EVCBatchDecoder:
             "nested_batches": 0,
         }
 
+        governance_operations = cast(list[Any], analysis["governance_operations"])
+        unknown_operations = cast(list[Any], analysis["unknown_operations"])
+
         # Collect addresses that need metadata (like the JavaScript version)
-        vault_addresses: set[str] = set()
-        router_addresses: set[str] = set()
-        oracle_addresses: set[str] = set()
-
-        def collect_addresses_from_items(items: list[BatchItem]) -> None:
-            for item in items:
-                if item.nested_batch:
-                    collect_addresses_from_items(item.nested_batch.items)
-
-                if item.decoded:
-                    func_name = item.decoded.get("functionName", "unknown")
-
-                    # Collect addresses that need metadata based on function type
-                    if func_name in [
-                        "setCaps",
-                        "setGovernorAdmin",
-                        "setFeeReceiver",
-                        "setInterestRateModel",
-                        "setMaxLiquidationDiscount",
-                        "setHookConfig",
-                        "setInterestFee",
-                        "setLiquidationCoolOffTime",
-                        "setLTV",
-                    ]:
-                        vault_addresses.add(item.target_contract)
-
-                    elif func_name in [
-                        "govSetConfig",
-                        "transferGovernance",
-                        "govSetResolvedVault",
-                        "govSetFallbackOracle",
-                    ]:
-                        router_addresses.add(item.target_contract)
+        # Deduplicated on the lowercase address (the key self.metadata uses), keeping the first
+        # spelling seen and the order in which addresses appear in the batch
+        vault_addresses: dict[str, str] = {}
+        router_addresses: dict[str, str] = {}
+        oracle_addresses: dict[str, str] = {}
+
+        # Walk the whole tree once, depth-first and in item order, with an explicit stack.
+        # Metadata addresses and governance operations are gathered from every level;
+        # per-contract changes and unknown operations are only reported for the top level.
+        stack: list[tuple[int, BatchItem, bool]] = [
+            (i, item, True) for i, item in reversed(list(enumerate(batch_decoding.items)))
+        ]
+        while stack:
+            i, item, top_level = stack.pop()
 
+            if item.nested_batch:
+                if top_level:
+                    analysis["nested_batches"] = cast(int, analysis["nested_batches"]) + 1
+                stack.extend((j, nested, False) for j, nested in reversed(list(enumerate(item.nested_batch.items))))
+
+            if not item.decoded:
+                continue
+
+            func_name = item.decoded.get("functionName", "unknown")
+
+            # governance_functions decides what counts as governance (and is highlighted in the
+            # item list); the category only says whether a known function changes a vault or router
+            if func_name in self.governance_functions:
+                category = _GOVERNANCE_CATEGORIES.get(func_name)
+                args = item.decoded.get("args", {})
+                if category == _VAULT_CATEGORY:
+                    vault_addresses.setdefault(item.target_contract.lower(), item.target_contract)
+                elif category == _ROUTER_CATEGORY:
+                    router_addresses.setdefault(item.target_contract.lower(), item.target_contract)
                     # Collect oracle addresses from function arguments
-                    if func_name == "govSetConfig" and "oracle" in item.decoded.get("args", {}):
-                        oracle_addresses.add(item.decoded["args"]["oracle"])
-
-        # Collect all addresses that need metadata
-        collect_addresses_from_items(batch_decoding.items)
+                    if func_name == "govSetConfig" and "oracle" in args:
+                        oracle_addresses.setdefault(args["oracle"].lower(), args["oracle"])
 
-        # Fetch metadata for collected addresses (like the JavaScript version)
-        if vault_addresses:
-            self.fetch_vault_metadata(list(vault_addresses), w3_client)
-        if router_addresses:
-            self.fetch_router_metadata(list(router_addresses), w3_client)
-        if oracle_addresses:
-            self.fetch_oracle_metadata(list(oracle_addresses), w3_client)
-
-        # Now analyze the items
-        for i, item in enumerate(batch_decoding.items):
-            if item.nested_batch:
-                analysis["nested_batches"] = cast(int, analysis["nested_batches"]) + 1
-                # Recursively analyze nested batch
-                nested_analysis = self.analyze_batch(item.nested_batch, w3_client)
-                cast(list[Any], analysis["governance_operations"]).extend(nested_analysis["governance_operations"])
+                governance_operations.append(
+                    {"index": i, "function": func_name, "target": item.target_contract, "args": args}
+                )
 
-            if item.decoded:
-                func_name = item.decoded.get("functionName", "unknown")
+                # Track changes by contract
+                if top_level and category is not None:
+                    changes_key = "vault_changes" if category == _VAULT_CATEGORY else "router_changes"
+                    contract_changes = cast(dict[str, Any], analysis[changes_key])
+                    contract_changes.setdefault(item.target_contract, []).append({"function": func_name, "args": args})
 
-                if func_name in self.governance_functions:
-                    cast(list[Any], analysis["governance_operations"]).append(
-                        {
-                            "index": i,
-                            "function": func_name,
-                            "target": item.target_contract,
-                            "args": item.decoded.get("args", {}),
-                        }
-                    )
-
-                    # Track changes by contract
-                    if func_name in [
-                        "setCaps",
-                        "setGovernorAdmin",
-                        "setFeeReceiver",
-                        "setInterestRateModel",
-                        "setMaxLiquidationDiscount",
-                        "setHookConfig",
-                        "setInterestFee",
-                        "setLiquidationCoolOffTime",
-                        "setLTV",
-                    ]:
-                        vault_changes = cast(dict[str, Any], analysis["vault_changes"])
-                        if item.target_contract not in vault_changes:
-                            vault_changes[item.target_contract] = []
-                        vault_changes[item.target_contract].append(
-                            {"function": func_name, "args": item.decoded.get("args", {})}
-                        )
-
-                    elif func_name in [
-                        "govSetConfig",
-                        "transferGovernance",
-                        "govSetResolvedVault",
-                        "govSetFallbackOracle",
-                    ]:
-                        router_changes = cast(dict[str, Any], analysis["router_changes"])
-                        if item.target_contract not in router_changes:
-                            router_changes[item.target_contract] = []
-                        router_changes[item.target_contract].append(
-                            {"function": func_name, "args": item.decoded.get("args", {})}
-                        )
-
-                elif func_name == "unknown":
-                    cast(list[Any], analysis["unknown_operations"]).append(
-                        {
-                            "index": i,
-                            "target": item.target_contract,
-                            "selector": item.decoded.get("selector", ""),
-                            "data_length": len(item.data) // 2 - 1,  # Convert hex length to bytes
-                        }
-                    )
+            elif func_name == "unknown" and top_level:
+                unknown_operations.append(
+                    {
+                        "index": i,
+                        "target": item.target_contract,
+                        "selector": item.decoded.get("selector", ""),
+                        "data_length": _hex_byte_length(item.data),
+                    }
+                )
 
-        return analysis
+        return (
+            analysis,
+            list(vault_addresses.values()),
+            list(router_addresses.values()),
+            list(oracle_addresses.values()),
+        )
 
     def format_readme_style(self, batch_decoding: BatchDecoding, analysis: dict[str, Any]) -> str:
         """Format output in the README expected style."""
@@ -667,23 +1098,85 @@ class EVCBatchDecoder:
 
         return "\n".join(output)
 
+    def _item_lines(self, batch_decoding: BatchDecoding) -> list[_ReportLine]:
+        """Build the batch items section, with nested batches listed under their item."""
+        lines: list[_ReportLine] = []
+        for i, item in enumerate(batch_decoding.items):
+            lines.extend(
+                [
+                    (1, f"Item {i}", None, "bold"),
+                    (2, "Target:", item.target_contract, "dim"),
+                    (2, "Value:", str(item.value), "dim"),
+                ]
+            )
+
+            if item.decoded:
+                func_name = item.decoded.get("functionName", "unknown")
+                lines.append(
+                    (2, "Function:", func_name, "green" if func_name in self.governance_functions else "yellow")
+                )
+                args = item.decoded.get("args", {})
+                if args:
+                    lines.append((2, "Arguments:", None, "dim"))
+                    lines.extend((3, f"{arg_name}:", str(arg_value), "") for arg_name, arg_value in args.items())
+            else:
+                lines.append((2, "Raw Data:", f"{item.data[:20]}...", "red"))
+
+            if item.nested_batch:
+                lines.append((2, "Nested Batch:", None, "bold magenta"))
+                for j, nested_item in enumerate(item.nested_batch.items):
+                    lines.append((3, f"Nested Item {j}", None, ""))
+                    if nested_item.decoded:
+                        lines.append((4, "Function:", nested_item.decoded.get("functionName", "unknown"), ""))
+        return lines
+
+    def format_plain(self, batch_decoding: BatchDecoding, analysis: dict[str, Any]) -> str:
+        """Format the same report as format_output as plain text, for output that isn't a terminal."""
+        output = [
+            _REPORT_TITLE,
+            "",
+            "Batch Summary",
+            *(f"  {metric}: {value}" for metric, value in _summary_rows(analysis)),
+            "",
+        ]
+
+        if batch_decoding.timelock_info:
+            output.extend([_timelock_text(batch_decoding.timelock_info), ""])
+
+        for title, lines in (
+            (_ITEMS_TITLE, self._item_lines(batch_decoding)),
+            (_CHANGES_TITLE, _change_lines(analysis)),
+            (_UNKNOWN_TITLE, _unknown_lines(analysis)),
+        ):
+            if lines:
+                output.append(title)
+                output.extend(_plain_line(line) for line in lines)
+                output.append("")
+
+        return "\n".join(output)
+
     def format_output(self, batch_decoding: BatchDecoding, analysis: dict[str, Any]) -> None:
         """Format and display the decoded batch information."""
+        console = _get_console("console")
+        # Rich tables, trees and panels are only worth building for a terminal
+        if not console.is_terminal:
+            print(self.format_plain(batch_decoding, analysis))
+            return
+
+        # pylint: disable=import-outside-toplevel
+        from rich.panel import Panel
+        from rich.table import Table
+        from rich.tree import Tree
 
         # Main header
-        console.print(Panel.fit("[bold blue]🧙‍♂️ EVC Batch Decoder Results[/bold blue]", border_style="blue"))
+        console.print(Panel.fit(f"[bold blue]{_REPORT_TITLE}[/bold blue]", border_style="blue"))
 
         # Summary table
         summary_table = Table(title="Batch Summary", show_header=True, header_style="bold magenta")
         summary_table.add_column("Metric", style="cyan")
         summary_table.add_column("Value", style="green")
-
-        summary_table.add_row("Total Items", str(analysis["total_items"]))
-        summary_table.add_row("Governance Operations", str(len(analysis["governance_operations"])))
-        summary_table.add_row("Vault Changes", str(len(analysis["vault_changes"])))
-        summary_table.add_row("Router Changes", str(len(analysis["router_changes"])))
-        summary_table.add_row("Unknown Operations", str(len(analysis["unknown_operations"])))
-        summary_table.add_row("Nested Batches", str(analysis["nested_batches"]))
+        for metric, value in _summary_rows(analysis):
+            summary_table.add_row(metric, value)
 
         console.print(summary_table)
         console.print()
@@ -691,72 +1184,30 @@ class EVCBatchDecoder:
         # Timelock information
         if batch_decoding.timelock_info:
             console.print(
-                Panel(
-                    f"[bold green]⏱️  TIMELOCK DELAY: {batch_decoding.timelock_info.delay} seconds[/bold green]",
-                    border_style="green",
-                )
+                Panel(f"[bold green]{_timelock_text(batch_decoding.timelock_info)}[/bold green]", border_style="green")
             )
             console.print()
 
-        # Detailed items
-        if batch_decoding.items:
-            items_tree = Tree("[bold]📋 Batch Items[/bold]")
-
-            for i, item in enumerate(batch_decoding.items):
-                item_node = items_tree.add(f"[bold]Item {i}[/bold]")
-                item_node.add(f"[dim]Target:[/dim] {item.target_contract}")
-                item_node.add(f"[dim]Value:[/dim] {item.value}")
+        # Detailed items, as a tree whose nodes follow the lines' depths
+        item_lines = self._item_lines(batch_decoding)
+        if item_lines:
+            nodes = [Tree(f"[bold]{_ITEMS_TITLE}[/bold]")]
+            for line in item_lines:
+                depth = line[0]
+                del nodes[depth:]
+                nodes.append(nodes[depth - 1].add(_markup_line(line)))
 
-                if item.decoded:
-                    func_name = item.decoded.get("functionName", "unknown")
-                    if func_name in self.governance_functions:
-                        item_node.add(f"[green]Function:[/green] {func_name}")
-                    else:
-                        item_node.add(f"[yellow]Function:[/yellow] {func_name}")
-
-                    args = item.decoded.get("args", {})
-                    if args:
-                        args_node = item_node.add("[dim]Arguments:[/dim]")
-                        for arg_name, arg_value in args.items():
-                            args_node.add(f"{arg_name}: {arg_value}")
-                else:
-                    item_node.add(f"[red]Raw Data:[/red] {item.data[:20]}...")
-
-                if item.nested_batch:
-                    nested_node = item_node.add("[bold magenta]Nested Batch:[/bold magenta]")
-                    for j, nested_item in enumerate(item.nested_batch.items):
-                        nested_item_node = nested_node.add(f"Nested Item {j}")
-                        if nested_item.decoded:
-                            nested_item_node.add(f"Function: {nested_item.decoded.get('functionName', 'unknown')}")
-
-            console.print(items_tree)
+            console.print(nodes[0])
             console.print()
 
-        # Governance changes summary
-        if analysis["vault_changes"] or analysis["router_changes"]:
-            console.print(Panel.fit("[bold]🔧 Configuration Changes[/bold]", border_style="yellow"))
-
-            if analysis["vault_changes"]:
-                console.print("[bold]Vault Changes:[/bold]")
-                for vault_addr, changes in analysis["vault_changes"].items():
-                    console.print(f"  [cyan]{vault_addr}[/cyan]:")
-                    for change in changes:
-                        args_str = ", ".join([f"{k}={v}" for k, v in change["args"].items()])
-                        console.print(f"    • {change['function']}({args_str})")
-                console.print()
-
-            if analysis["router_changes"]:
-                console.print("[bold]Router Changes:[/bold]")
-                for router_addr, changes in analysis["router_changes"].items():
-                    console.print(f"  [cyan]{router_addr}[/cyan]:")
-                    for change in changes:
-                        args_str = ", ".join([f"{k}={v}" for k, v in change["args"].items()])
-                        console.print(f"    • {change['function']}({args_str})")
-                console.print()
-
-        # Unknown operations
-        if analysis["unknown_operations"]:
-            console.print(Panel.fit("[bold red]❓ Unknown Operations[/bold red]", border_style="red"))
-            for op in analysis["unknown_operations"]:
-                console.print(f"  Item {op['index']}: {op['selector']} → {op['target']} ({op['data_length']} bytes)")
-            console.print()
+        # Governance changes and unknown operations, each rendered as one block of markup
+        # instead of a print per line
+        change_lines = _change_lines(analysis)
+        if change_lines:
+            console.print(Panel.fit(f"[bold]{_CHANGES_TITLE}[/bold]", border_style="yellow"))
+            console.print("".join(f"{'  ' * line[0]}{_markup_line(line)}\n" for line in change_lines))
+
+        unknown_lines = _unknown_lines(analysis)
+        if unknown_lines:
+            console.print(Panel.fit(f"[bold red]{_UNKNOWN_TITLE}[/bold red]", border_style="red"))
+            console.print("".join(f"{'  ' * line[0]}{_markup_line(line)}\n" for line in unknown_lines))
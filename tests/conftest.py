@@ -0,0 +1,42 @@
+"""Shared pytest fixtures."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from unittest.mock import MagicMock, patch
+
+import pytest
+from click.testing import CliRunner
+
+from evc_batch_decoder.decoder import EVCBatchDecoder
+
+
+def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item]) -> None:
+    """Skip tests marked slow unless the -m expression asks for them."""
+    if "slow" in config.getoption("markexpr"):
+        return
+    skip_slow = pytest.mark.skip(reason="slow; run with -m slow")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip_slow)
+
+
+@pytest.fixture
+def decoder() -> EVCBatchDecoder:
+    """Create a fresh decoder for each test; modules that never mutate it may override with a wider scope."""
+    return EVCBatchDecoder()
+
+
+@pytest.fixture(scope="session")
+def runner() -> CliRunner:
+    """Create a CLI runner shared by the whole session; each invoke is isolated."""
+    return CliRunner()
+
+
+@pytest.fixture
+def web3_mocks() -> Iterator[tuple[MagicMock, MagicMock]]:
+    """Patch the CLI's Web3 factory; yield the patched factory and the client it returns."""
+    with patch("evc_batch_decoder.cli._get_web3") as mock_web3:
+        mock_w3_instance = MagicMock()
+        mock_web3.return_value = mock_w3_instance
+        yield mock_web3, mock_w3_instance
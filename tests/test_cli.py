@@ -3,22 +3,17 @@
 from __future__ import annotations
 
 import json
-import tempfile
-from unittest.mock import Mock, patch
+from pathlib import Path
+from unittest.mock import MagicMock, patch
 
 import pytest
-from click.testing import CliRunner
+from click.testing import CliRunner, Result
+from hexbytes import HexBytes
 
 from evc_batch_decoder.cli import decode_batch
 
 
-@pytest.fixture
-def runner() -> CliRunner:
-    """Create a CLI runner for testing."""
-    return CliRunner()
-
-
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_batch_data() -> str:
     """Sample batch data for testing."""
     return (
@@ -28,7 +23,7 @@ def sample_batch_data() -> str:
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_json_data() -> str:
     """Sample JSON data for testing."""
     return (
@@ -38,17 +33,28 @@ def sample_json_data() -> str:
     )
 
 
-def test_cli_basic_decode(runner: CliRunner, sample_batch_data: str) -> None:
+@pytest.fixture(scope="session")
+def decoded_outputs(runner: CliRunner, sample_batch_data: str) -> dict[str, Result]:
+    """Decode the sample batch once per output mode; the output is deterministic."""
+    return {
+        "default": runner.invoke(decode_batch, [sample_batch_data]),
+        "json": runner.invoke(decode_batch, [sample_batch_data, "--json-output"]),
+        "readme": runner.invoke(decode_batch, [sample_batch_data, "--readme-format"]),
+        "chain": runner.invoke(decode_batch, [sample_batch_data, "--chain-id", "1"]),
+    }
+
+
+def test_cli_basic_decode(decoded_outputs: dict[str, Result]) -> None:
     """Test basic CLI decoding functionality."""
-    result = runner.invoke(decode_batch, [sample_batch_data])
+    result = decoded_outputs["default"]
 
     assert result.exit_code == 0
     assert "EVC Batch Decoder Results" in result.output
 
 
-def test_cli_json_output(runner: CliRunner, sample_batch_data: str) -> None:
+def test_cli_json_output(decoded_outputs: dict[str, Result]) -> None:
     """Test CLI with JSON output flag."""
-    result = runner.invoke(decode_batch, [sample_batch_data, "--json-output"])
+    result = decoded_outputs["json"]
 
     assert result.exit_code == 0
     # Should contain JSON-like structure
@@ -57,39 +63,38 @@ def test_cli_json_output(runner: CliRunner, sample_batch_data: str) -> None:
     assert '"items"' in result.output
 
 
-def test_cli_readme_format(runner: CliRunner, sample_batch_data: str) -> None:
+def test_cli_readme_format(decoded_outputs: dict[str, Result]) -> None:
     """Test CLI with README format flag."""
-    result = runner.invoke(decode_batch, [sample_batch_data, "--readme-format"])
+    result = decoded_outputs["readme"]
 
     assert result.exit_code == 0
     assert "Changes:" in result.output
 
 
-def test_cli_file_input(runner: CliRunner, sample_json_data: str) -> None:
+def test_cli_file_input(runner: CliRunner, sample_json_data: str, tmp_path: Path) -> None:
     """Test CLI with file input."""
-    with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as f:
-        json.dump(sample_json_data, f)
-        temp_file = f.name
+    temp_file = tmp_path / "input.json"
+    temp_file.write_text(json.dumps(sample_json_data))
 
-    result = runner.invoke(decode_batch, ["--file", temp_file])
+    result = runner.invoke(decode_batch, ["--file", str(temp_file)])
 
     assert result.exit_code == 0
     assert "EVC Batch Decoder Results" in result.output
 
 
-def test_cli_chain_id_option(runner: CliRunner, sample_batch_data: str) -> None:
+def test_cli_chain_id_option(decoded_outputs: dict[str, Result]) -> None:
     """Test CLI with chain ID option."""
-    result = runner.invoke(decode_batch, [sample_batch_data, "--chain-id", "1"])
+    result = decoded_outputs["chain"]
 
     assert result.exit_code == 0
     assert "EVC Batch Decoder Results" in result.output
 
 
-@patch("evc_batch_decoder.cli.Web3")
-def test_cli_with_rpc_url_success(mock_web3: Mock, runner: CliRunner, sample_batch_data: str) -> None:
+def test_cli_with_rpc_url_success(
+    runner: CliRunner, sample_batch_data: str, web3_mocks: tuple[MagicMock, MagicMock]
+) -> None:
     """Test CLI with RPC URL option (successful connection)."""
-    mock_w3_instance = Mock()
-    mock_web3.return_value = mock_w3_instance
+    _, mock_w3_instance = web3_mocks
 
     result = runner.invoke(decode_batch, [sample_batch_data, "--rpc-url", "https://eth.llamarpc.com"])
 
@@ -97,9 +102,11 @@ def test_cli_with_rpc_url_success(mock_web3: Mock, runner: CliRunner, sample_bat
     assert "Connected to RPC" in result.output
 
 
-@patch("evc_batch_decoder.cli.Web3")
-def test_cli_with_rpc_url_failure(mock_web3: Mock, runner: CliRunner, sample_batch_data: str) -> None:
+def test_cli_with_rpc_url_failure(
+    runner: CliRunner, sample_batch_data: str, web3_mocks: tuple[MagicMock, MagicMock]
+) -> None:
     """Test CLI with RPC URL option (connection failure)."""
+    mock_web3, _ = web3_mocks
     mock_web3.side_effect = Exception("Connection failed")
 
     result = runner.invoke(decode_batch, [sample_batch_data, "--rpc-url", "https://invalid-url.com"])
@@ -116,18 +123,17 @@ def test_cli_tx_hash_without_rpc(runner: CliRunner) -> None:
     assert "Error: --rpc-url is required when using --tx-hash" in result.output
 
 
-@patch("evc_batch_decoder.cli.Web3")
-def test_cli_tx_hash_with_rpc_success(mock_web3: Mock, runner: CliRunner) -> None:
+def test_cli_tx_hash_with_rpc_success(runner: CliRunner, web3_mocks: tuple[MagicMock, MagicMock]) -> None:
     """Test CLI with tx-hash and RPC (successful)."""
     # Mock Web3 and transaction
-    mock_w3_instance = Mock()
-    mock_web3.return_value = mock_w3_instance
-
-    mock_tx = {"input": Mock()}
-    mock_tx["input"].hex.return_value = (
-        "0x0ac3e31800000000000000000000000000000000000000000000000000000000"
-        "000000640000000000000000000000000000000000000000000000000000000000000064"
-    )
+    _, mock_w3_instance = web3_mocks
+
+    mock_tx = {
+        "input": HexBytes(
+            "0x0ac3e31800000000000000000000000000000000000000000000000000000000"
+            "000000640000000000000000000000000000000000000000000000000000000000000064"
+        )
+    }
     mock_w3_instance.eth.get_transaction.return_value = mock_tx
 
     result = runner.invoke(decode_batch, ["--tx-hash", "0xabc123", "--rpc-url", "https://eth.llamarpc.com"])
@@ -136,12 +142,10 @@ def test_cli_tx_hash_with_rpc_success(mock_web3: Mock, runner: CliRunner) -> Non
     assert "Loaded transaction data from" in result.output
 
 
-@patch("evc_batch_decoder.cli.Web3")
-def test_cli_tx_hash_with_rpc_failure(mock_web3: Mock, runner: CliRunner) -> None:
+def test_cli_tx_hash_with_rpc_failure(runner: CliRunner, web3_mocks: tuple[MagicMock, MagicMock]) -> None:
     """Test CLI with tx-hash and RPC (transaction fetch failure)."""
     # Mock Web3 but make transaction fetch fail
-    mock_w3_instance = Mock()
-    mock_web3.return_value = mock_w3_instance
+    _, mock_w3_instance = web3_mocks
     mock_w3_instance.eth.get_transaction.side_effect = Exception("Transaction not found")
 
     result = runner.invoke(decode_batch, ["--tx-hash", "0xabc123", "--rpc-url", "https://eth.llamarpc.com"])
@@ -196,3 +200,129 @@ def test_cli_help(runner: CliRunner) -> None:
 
     assert result.exit_code == 0
     assert "Decode EVC batch transaction data" in result.output
+
+
+def test_cli_json_output_large_integers(runner: CliRunner) -> None:
+    """Test JSON output with uint256 values that don't fit in 64 bits."""
+    # Single-item batch whose value exceeds 2**64
+    data = (
+        "0x72e94bf6"
+        "0000000000000000000000000000000000000000000000000000000000000020"
+        "0000000000000000000000000000000000000000000000000000000000000001"
+        "0000000000000000000000000000000000000000000000000000000000000020"
+        "0000000000000000000000001234567890123456789012345678901234567890"
+        "0000000000000000000000000000000000000000000000000000000000000000"
+        "0000000000000000000000000000000000000000000000ffffffffffffffffff"
+        "0000000000000000000000000000000000000000000000000000000000000080"
+        "0000000000000000000000000000000000000000000000000000000000000000"
+    )
+    result = runner.invoke(decode_batch, [data, "--json-output"])
+
+    assert result.exit_code == 0
+    assert str(0xFFFFFFFFFFFFFFFFFF) in result.output
+
+
+def test_cli_json_output_without_orjson(runner: CliRunner, sample_batch_data: str) -> None:
+    """Test JSON output falls back to the standard library when orjson is missing."""
+    with patch("evc_batch_decoder.cli._get_orjson", return_value=None):
+        result = runner.invoke(decode_batch, [sample_batch_data, "--json-output"])
+
+    assert result.exit_code == 0
+    assert '"analysis"' in result.output
+
+
+@pytest.mark.parametrize("orjson_available", [True, False])
+def test_iter_json_output_matches_full_dump(orjson_available: bool, sample_batch_data: str) -> None:
+    """Test that streamed JSON output has the same layout as dumping the whole result."""
+    from evc_batch_decoder.cli import _batch_to_dict, _get_orjson, _iter_json_output
+    from evc_batch_decoder.decoder import BatchDecoding, EVCBatchDecoder, TimelockInfo
+
+    decoder = EVCBatchDecoder()
+    for batch_decoding in (
+        decoder.decode_batch_data(sample_batch_data),
+        BatchDecoding(items=[], timelock_info=TimelockInfo(delay=3600)),
+    ):
+        analysis = decoder.analyze_batch(batch_decoding)
+        expected = {"batch": _batch_to_dict(batch_decoding), "analysis": analysis}
+
+        with patch("evc_batch_decoder.cli._get_orjson", return_value=_get_orjson() if orjson_available else None):
+            streamed = b"".join(_iter_json_output(batch_decoding, analysis))
+
+        assert json.loads(streamed) == json.loads(json.dumps(expected, default=str))
+        if not orjson_available:
+            assert streamed == json.dumps(expected, indent=2, default=str).encode() + b"\n"
+
+
+def test_batch_to_dict_nested_batch() -> None:
+    """Test that nested batches are emitted as JSON objects rather than reprs."""
+    from evc_batch_decoder.cli import _batch_to_dict
+    from evc_batch_decoder.decoder import BatchDecoding, BatchItem
+
+    inner = BatchItem(target_contract="0x1111111111111111111111111111111111111111", data="0ac3e318")
+    outer = BatchItem(
+        target_contract="0x2222222222222222222222222222222222222222",
+        data="72e94bf6",
+        nested_batch=BatchDecoding(items=[inner]),
+    )
+
+    result = _batch_to_dict(BatchDecoding(items=[outer]))
+
+    nested = result["items"][0]["nested_batch"]
+    assert nested["items"][0]["target_contract"] == inner.target_contract
+    assert nested["timelock_info"] is None
+
+
+def test_cli_json_output_stdout_is_pure_json(decoded_outputs: dict[str, Result]) -> None:
+    """Test that status messages go to stderr so stdout can be piped to a JSON parser."""
+    result = decoded_outputs["json"]
+
+    assert result.exit_code == 0
+    assert "Decoding batch data" in result.stderr
+    assert json.loads(result.stdout)["analysis"]["total_items"] == 1
+
+
+def test_cli_readme_format_keeps_markdown_links(decoded_outputs: dict[str, Result]) -> None:
+    """Test that README output is printed verbatim rather than parsed as rich markup."""
+    result = decoded_outputs["readme"]
+
+    assert result.exit_code == 0
+    assert "(https://snowtrace.io/address/0x0000000000000000000000000000000000000000)" in result.stdout
+    assert result.stdout.startswith("# Changes: 1 modified vaults")
+
+
+def test_cli_multiple_tx_hashes_use_batch_request(
+    runner: CliRunner, sample_batch_data: str, web3_mocks: tuple[MagicMock, MagicMock]
+) -> None:
+    """Test that several --tx-hash values are fetched in one JSON-RPC batch request."""
+    _, mock_w3_instance = web3_mocks
+    batch = mock_w3_instance.batch_requests.return_value.__enter__.return_value
+    batch.execute.return_value = [{"input": HexBytes(sample_batch_data)}, {"input": HexBytes(sample_batch_data)}]
+
+    result = runner.invoke(
+        decode_batch,
+        ["-t", "0xabc123", "-t", "0xdef456", "--rpc-url", "https://eth.llamarpc.com", "--readme-format"],
+    )
+
+    assert result.exit_code == 0
+    assert batch.add.call_count == 2
+    batch.execute.assert_called_once()
+    assert result.stdout.count("# Changes:") == 2
+
+
+def test_cli_multiple_tx_hashes_continue_past_malformed_batch(
+    runner: CliRunner, sample_batch_data: str, web3_mocks: tuple[MagicMock, MagicMock]
+) -> None:
+    """Test that a transaction with truncated batch calldata is reported and later hashes still decode."""
+    _, mock_w3_instance = web3_mocks
+    truncated_batch = HexBytes("0x72e94bf6" + "20".rjust(64, "0") + "1".rjust(64, "0"))
+    batch = mock_w3_instance.batch_requests.return_value.__enter__.return_value
+    batch.execute.return_value = [{"input": truncated_batch}, {"input": HexBytes(sample_batch_data)}]
+
+    result = runner.invoke(
+        decode_batch,
+        ["-t", "0xabc123", "-t", "0xdef456", "--rpc-url", "https://eth.llamarpc.com", "--readme-format"],
+    )
+
+    assert result.exit_code == 1
+    assert "Error decoding batch: Tried to read 32 bytes at offset 68" in result.stderr
+    assert result.stdout.count("# Changes:") == 1
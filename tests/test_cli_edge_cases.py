@@ -2,26 +2,19 @@
 
 from __future__ import annotations
 
-import tempfile
-from unittest.mock import Mock, patch
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock, patch
 
 import pytest
 from click.testing import CliRunner
 
-from evc_batch_decoder.cli import decode_batch
+from evc_batch_decoder.cli import _get_decoder, _parse_stdin_bytes, decode_batch
 
 
-@pytest.fixture
-def runner() -> CliRunner:
-    """Create a CLI runner for testing."""
-    return CliRunner()
-
-
-@patch("evc_batch_decoder.cli.Web3")
-def test_cli_tx_hash_rpc_connection_but_tx_error(mock_web3: Mock, runner: CliRunner) -> None:
+def test_cli_tx_hash_rpc_connection_but_tx_error(runner: CliRunner, web3_mocks: tuple[MagicMock, MagicMock]) -> None:
     """Test CLI with RPC connection success but transaction retrieval error."""
-    mock_w3_instance = Mock()
-    mock_web3.return_value = mock_w3_instance
+    _, mock_w3_instance = web3_mocks
     # Connection succeeds but transaction fetch fails
     mock_w3_instance.eth.get_transaction.side_effect = Exception("Transaction not found")
 
@@ -31,13 +24,12 @@ def test_cli_tx_hash_rpc_connection_but_tx_error(mock_web3: Mock, runner: CliRun
     assert "Error loading transaction" in result.output
 
 
-def test_cli_file_with_invalid_json(runner: CliRunner) -> None:
+def test_cli_file_with_invalid_json(runner: CliRunner, tmp_path: Path) -> None:
     """Test CLI with file containing invalid JSON."""
-    with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as f:
-        f.write('{"invalid": json}')  # Invalid JSON
-        temp_file = f.name
+    temp_file = tmp_path / "input.json"
+    temp_file.write_text('{"invalid": json}')  # Invalid JSON
 
-    result = runner.invoke(decode_batch, ["--file", temp_file])
+    result = runner.invoke(decode_batch, ["--file", str(temp_file)])
 
     # Should still work, treating as raw hex string
     assert result.exit_code == 1  # Will fail due to invalid hex
@@ -66,11 +58,9 @@ def test_cli_with_debug_flag(runner: CliRunner) -> None:
     assert "error" in result.output.lower() or "Error" in result.output
 
 
-@patch("evc_batch_decoder.cli.Web3")
-def test_cli_tx_hash_with_hex_bytes_input(mock_web3: Mock, runner: CliRunner) -> None:
+def test_cli_tx_hash_with_hex_bytes_input(runner: CliRunner, web3_mocks: tuple[MagicMock, MagicMock]) -> None:
     """Test CLI with transaction that returns hex bytes."""
-    mock_w3_instance = Mock()
-    mock_web3.return_value = mock_w3_instance
+    _, mock_w3_instance = web3_mocks
 
     # Mock transaction with hex bytes (no .hex() method)
     mock_tx = {
@@ -87,27 +77,168 @@ def test_cli_tx_hash_with_hex_bytes_input(mock_web3: Mock, runner: CliRunner) ->
     assert result.exit_code == 0
 
 
-def test_cli_file_read_with_plain_text(runner: CliRunner) -> None:
+def test_cli_file_read_with_plain_text(runner: CliRunner, tmp_path: Path) -> None:
     """Test CLI file reading with plain text (not JSON)."""
-    with tempfile.NamedTemporaryFile(mode="w", suffix=".txt", delete=False) as f:
-        f.write(
-            (
-                "0x0ac3e318"
-                "0000000000000000000000000000000000000000000000000000000000000064"
-                "000000000000000000000000000000000000000000000000000000000000003c"
-            )
-        )  # Plain hex string
-        temp_file = f.name
-
-    result = runner.invoke(decode_batch, ["--file", temp_file])
+    temp_file = tmp_path / "input.txt"
+    temp_file.write_text(
+        (
+            "0x0ac3e318"
+            "0000000000000000000000000000000000000000000000000000000000000064"
+            "000000000000000000000000000000000000000000000000000000000000003c"
+        )
+    )  # Plain hex string
+
+    result = runner.invoke(decode_batch, ["--file", str(temp_file)])
 
     assert result.exit_code == 0
     assert "EVC Batch Decoder Results" in result.output
 
 
-def test_cli_empty_stdin(runner: CliRunner) -> None:
-    """Test CLI with empty stdin."""
-    result = runner.invoke(decode_batch, input="")
+@pytest.mark.parametrize("stdin", ["", " ", "\n", "\t", "\n\n\n", " \n \t \n \r "])
+def test_cli_empty_stdin(runner: CliRunner, stdin: str) -> None:
+    """Test CLI with empty or whitespace-only stdin."""
+    result = runner.invoke(decode_batch, input=stdin)
 
     assert result.exit_code == 1
     assert "No batch data provided" in result.output
+
+
+def test_cli_missing_dependency(runner: CliRunner, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test CLI reports a missing dependency instead of a traceback."""
+    _get_decoder.cache_clear()
+    # Only this key is restored afterwards; patch.dict would also drop every module the CLI imports meanwhile,
+    # and re-importing those (e.g. rich.segment) later creates duplicate classes that fail isinstance checks
+    monkeypatch.setitem(sys.modules, "evc_batch_decoder.decoder", None)
+    result = runner.invoke(decode_batch, ["0x0ac3e318"])
+
+    assert result.exit_code == 1
+    assert "missing required dependency" in result.output
+
+
+@pytest.mark.slow
+def test_get_web3_reuses_session_per_rpc_url() -> None:
+    """Test that clients for the same RPC URL share one pooled HTTP session."""
+    from evc_batch_decoder.cli import _get_session, _get_web3
+
+    client = _get_web3("https://rpc.example.com")
+
+    # web3's own request timeout is kept
+    assert "timeout" not in client.provider.get_request_kwargs()
+    assert _get_session("https://rpc.example.com") is _get_session("https://rpc.example.com")
+    assert _get_session("https://rpc.example.com") is not _get_session("https://other.example.com")
+
+
+@pytest.mark.parametrize("template", ["\n  {}\n", '\n  {{"data": "{}"}}\n'], ids=["hex", "json"])
+def test_cli_file_with_surrounding_whitespace(runner: CliRunner, template: str, tmp_path: Path) -> None:
+    """Test CLI file reading tolerates whitespace around hex and JSON content."""
+    hex_data = (
+        "0x0ac3e318"
+        "0000000000000000000000000000000000000000000000000000000000000064"
+        "000000000000000000000000000000000000000000000000000000000000003c"
+    )
+    temp_file = tmp_path / "input.txt"
+    temp_file.write_text(template.format(hex_data))
+
+    result = runner.invoke(decode_batch, ["--file", str(temp_file)])
+
+    assert result.exit_code == 0
+    assert "EVC Batch Decoder Results" in result.output
+
+
+def test_cli_multi_decodes_each_stdin_line(runner: CliRunner) -> None:
+    """Test --multi decodes one input per line and reports failures at the end."""
+    hex_data = (
+        "0x0ac3e318"
+        "0000000000000000000000000000000000000000000000000000000000000064"
+        "000000000000000000000000000000000000000000000000000000000000003c"
+    )
+
+    result = runner.invoke(decode_batch, ["--multi", "--readme-format"], input=f"{hex_data}\n\n{hex_data}\n")
+
+    assert result.exit_code == 0
+    assert result.stdout.count("# Changes: 1 modified vaults") == 2
+
+    result = runner.invoke(decode_batch, ["--multi", "--readme-format"], input=f"invalid\n{hex_data}\n")
+
+    assert result.exit_code == 1
+    assert "Error decoding batch" in result.output
+    assert result.stdout.count("# Changes: 1 modified vaults") == 1
+
+    # A batch declaring one item but cut off before its head fails on its own line only
+    truncated_batch = "0x72e94bf6" + "20".rjust(64, "0") + "1".rjust(64, "0")
+    result = runner.invoke(
+        decode_batch, ["--multi", "--readme-format"], input=f"{hex_data}\n{truncated_batch}\n{hex_data}\n"
+    )
+
+    assert result.exit_code == 1
+    assert result.exception is None or isinstance(result.exception, SystemExit)
+    assert "Error decoding batch: Tried to read 32 bytes at offset 68" in result.output
+    assert result.stdout.count("# Changes: 1 modified vaults") == 2
+
+
+def test_get_decoder_is_cached_per_chain() -> None:
+    """Test that decoders are reused per chain ID."""
+    assert _get_decoder(1) is _get_decoder(1)
+    assert _get_decoder(1) is not _get_decoder(8453)
+
+
+@pytest.mark.parametrize(
+    ("args", "stdin", "message"),
+    [
+        (["0xnothex!"], None, "not hex-encoded"),
+        (["0x1234"], None, "too short"),
+        (["--file", "-"], '{"nodata": "0x"}', "must contain 'data' field"),
+    ],
+)
+def test_cli_rejects_malformed_input_before_decoding(
+    runner: CliRunner, args: list[str], stdin: str | None, message: str
+) -> None:
+    """Test that non-hex, too-short and data-less input is rejected without running the decoder."""
+    with patch("evc_batch_decoder.decoder.EVCBatchDecoder.decode_batch_data") as mock_decode:
+        result = runner.invoke(decode_batch, args, input=stdin)
+
+    assert result.exit_code == 1
+    assert message in result.output
+    mock_decode.assert_not_called()
+
+
+def test_cli_reports_truncated_batch_calldata(runner: CliRunner) -> None:
+    """Test that batch calldata passing the pre-checks but cut short fails cleanly in the decoder."""
+    # batch() with one item whose 40-byte payload has been cut off
+    truncated_batch = (
+        "0x72e94bf6"
+        + "20".rjust(64, "0")
+        + "1".rjust(64, "0")
+        + "20".rjust(64, "0")
+        + ("11" * 20).rjust(64, "0") * 2
+        + "0" * 64
+        + "80".rjust(64, "0")
+        + "28".rjust(64, "0")
+    )
+
+    result = runner.invoke(decode_batch, [truncated_batch])
+
+    assert result.exit_code == 1
+    assert isinstance(result.exception, SystemExit)
+    assert "Error decoding batch: Tried to read 64 bytes" in result.output
+    assert "Traceback" not in result.output
+
+
+def test_cli_accepts_line_wrapped_hex_file(runner: CliRunner, tmp_path: Path) -> None:
+    """Test that hex wrapped over several lines decodes like the same hex on one line."""
+    hex_file = tmp_path / "calldata.txt"
+    hex_file.write_text("0x0ac3e318\n" + "64".rjust(64, "0") + "\n" + "3c".rjust(64, "0") + "\n")
+
+    result = runner.invoke(decode_batch, ["--file", str(hex_file)])
+
+    assert result.exit_code == 0
+    assert "setCaps" in result.output
+
+
+def test_parse_stdin_bytes() -> None:
+    """Test that piped hex becomes calldata bytes and everything else stays text."""
+    assert _parse_stdin_bytes(b"0x12345678") == bytes.fromhex("12345678")
+    assert _parse_stdin_bytes(b"12345678") == bytes.fromhex("12345678")
+    assert _parse_stdin_bytes(b'{"data": "0x12345678"}') == '{"data": "0x12345678"}'
+    assert _parse_stdin_bytes(b"0xnothex!") == "0xnothex!"
+    assert _parse_stdin_bytes(b"0x123") == "0x123"
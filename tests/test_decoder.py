@@ -2,28 +2,43 @@
 
 from __future__ import annotations
 
+import json
+from typing import Any
+
 import pytest
 
-from evc_batch_decoder.decoder import EVCBatchDecoder
+from evc_batch_decoder.decoder import BatchDecoding, EVCBatchDecoder
+
+# setCaps(supplyCap=100, borrowCap=60): selector + args
+SET_CAPS_HEX = (
+    "0x0ac3e318"
+    "0000000000000000000000000000000000000000000000000000000000000064"
+    "000000000000000000000000000000000000000000000000000000000000003c"
+)
+JSON_SET_CAPS = {"data": SET_CAPS_HEX}
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def decoder() -> EVCBatchDecoder:
-    """Create a decoder instance for testing."""
+    """Create one decoder for the module; these tests only decode and analyze."""
     return EVCBatchDecoder()
 
 
-def test_simple_batch_decoding(decoder: EVCBatchDecoder) -> None:
-    """Test decoding a simple batch operation."""
-    # Test data: A simple setCaps function call
-    # setCaps(supplyCap=1000, borrowCap=800)
-    set_caps_data = (
-        "0x0ac3e318"
-        "0000000000000000000000000000000000000000000000000000000000000064"
-        "000000000000000000000000000000000000000000000000000000000000003c"
-    )  # setCaps selector + args
+@pytest.fixture(scope="module")
+def set_caps_result(decoder: EVCBatchDecoder) -> BatchDecoding:
+    """Decode the setCaps payload once for the module."""
+    return decoder.decode_batch_data(SET_CAPS_HEX)
+
+
+@pytest.fixture(scope="module")
+def set_caps_analysis(decoder: EVCBatchDecoder, set_caps_result: BatchDecoding) -> dict[str, Any]:
+    """Analyze the decoded setCaps payload once for the module."""
+    return decoder.analyze_batch(set_caps_result)
 
-    result = decoder.decode_batch_data(set_caps_data)
+
+def test_simple_batch_decoding(set_caps_result: BatchDecoding) -> None:
+    """Test decoding a simple batch operation."""
+    result = set_caps_result
 
     # Verify basic structure
     assert result.items
@@ -39,33 +54,22 @@ def test_simple_batch_decoding(decoder: EVCBatchDecoder) -> None:
     assert "args" in decoded
 
 
-def test_json_input_format(decoder: EVCBatchDecoder) -> None:
-    """Test JSON input format."""
-    json_data = {
-        "data": (
-            "0x0ac3e318"
-            "0000000000000000000000000000000000000000000000000000000000000064"
-            "000000000000000000000000000000000000000000000000000000000000003c"
-        )
-    }
+@pytest.mark.parametrize("json_input", [JSON_SET_CAPS, json.dumps(JSON_SET_CAPS)], ids=["dict", "string"])
+def test_json_input_format(
+    decoder: EVCBatchDecoder, set_caps_result: BatchDecoding, json_input: str | dict[str, Any]
+) -> None:
+    """Test JSON input format, both already parsed and as a JSON string."""
+    result = decoder.decode_batch_data(json_input)
 
-    result = decoder.decode_batch_data(json_data)
-
-    # Should successfully decode JSON format
+    # Should successfully decode JSON format, exactly like the raw hex
     assert result.items
     assert len(result.items) == 1
+    assert result.items[0].decoded == set_caps_result.items[0].decoded
 
 
-def test_batch_analysis(decoder: EVCBatchDecoder) -> None:
+def test_batch_analysis(set_caps_result: BatchDecoding, set_caps_analysis: dict[str, Any]) -> None:
     """Test batch analysis functionality."""
-    set_caps_data = (
-        "0x0ac3e318"
-        "0000000000000000000000000000000000000000000000000000000000000064"
-        "000000000000000000000000000000000000000000000000000000000000003c"
-    )
-
-    result = decoder.decode_batch_data(set_caps_data)
-    analysis = decoder.analyze_batch(result)
+    analysis = set_caps_analysis
 
     # Verify analysis structure
     assert "total_items" in analysis
@@ -76,4 +80,4 @@ def test_batch_analysis(decoder: EVCBatchDecoder) -> None:
     assert "nested_batches" in analysis
 
     # Verify counts
-    assert analysis["total_items"] == len(result.items)
+    assert analysis["total_items"] == len(set_caps_result.items)
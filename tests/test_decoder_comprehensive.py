@@ -2,18 +2,17 @@
 
 from __future__ import annotations
 
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 
+import eth_abi
 import pytest
 from eth_abi.exceptions import InsufficientDataBytes
 
 from evc_batch_decoder.decoder import BatchDecoding, BatchItem, EVCBatchDecoder, TimelockInfo
 
-
-@pytest.fixture
-def decoder() -> EVCBatchDecoder:
-    """Create a decoder instance for testing."""
-    return EVCBatchDecoder()
+# Multicall results for a vault's name() and asset() calls
+VAULT_NAME_RESULT = eth_abi.encode(["string"], ["Test Vault"])
+VAULT_ASSET_RESULT = eth_abi.encode(["address"], ["0x1234567890123456789012345678901234567890"])
 
 
 @pytest.fixture
@@ -22,10 +21,19 @@ def decoder_mainnet() -> EVCBatchDecoder:
     return EVCBatchDecoder(chain_id=1)
 
 
+def _make_mock_web3() -> Mock:
+    """Create a Web3-specced mock, so only real Web3 attributes can be touched."""
+    from web3 import Web3
+
+    w3 = Mock(spec=Web3)
+    w3.eth = Mock()
+    return w3
+
+
 @pytest.fixture
 def mock_web3() -> Mock:
     """Create a mock Web3 instance."""
-    return Mock()
+    return _make_mock_web3()
 
 
 class TestEVCBatchDecoder:
@@ -58,6 +66,86 @@ class TestEVCBatchDecoder:
         assert "0x0ac3e318" in signatures  # setCaps function
         assert signatures["0x0ac3e318"]["name"] == "setCaps"
 
+    def test_function_signatures_are_not_shared_between_decoders(self, decoder: EVCBatchDecoder) -> None:
+        """Test that editing one decoder's signature entries leaves the shared table untouched."""
+        from evc_batch_decoder.decoder import FUNCTION_SIGNATURES
+
+        signatures = decoder._load_function_signatures()
+        signatures["0x0ac3e318"]["name"] = "renamed"
+        signatures["0x0ac3e318"]["inputs"][0]["name"] = "renamed"
+
+        assert FUNCTION_SIGNATURES["0x0ac3e318"]["name"] == "setCaps"
+        assert FUNCTION_SIGNATURES["0x0ac3e318"]["inputs"][0]["name"] == "supplyCap"
+
+    def test_add_function_signature(self, decoder: EVCBatchDecoder) -> None:
+        """Test that added signatures are decoded by this decoder only."""
+        calldata = bytes.fromhex("12345678" + "2a".rjust(64, "0"))
+        assert decoder._decode_function_call(calldata)["functionName"] == "unknown"
+
+        decoder.add_function_signature("0x12345678", "setAnswer", [{"name": "answer", "type": "uint256"}])
+
+        assert decoder.function_signatures["0x12345678"]["name"] == "setAnswer"
+        assert decoder._decode_function_call(calldata) == {
+            "functionName": "setAnswer",
+            "selector": "0x12345678",
+            "args": {"answer": 42},
+        }
+        # Other decoders, built from the shared index, don't see the addition
+        assert EVCBatchDecoder()._decode_function_call(calldata)["functionName"] == "unknown"
+        with pytest.raises(ValueError, match="must be 4 bytes"):
+            decoder.add_function_signature("0x1234", "short", [])
+
+    def test_function_signatures_edits_update_decoding(self, decoder: EVCBatchDecoder) -> None:
+        """Test that assigning, deleting and replacing signature entries changes what is decoded."""
+        calldata = bytes.fromhex("12345678" + "2a".rjust(64, "0"))
+        set_caps = bytes.fromhex("0ac3e318" + "64".rjust(64, "0") + "3c".rjust(64, "0"))
+
+        decoder.function_signatures["0x12345678"] = {"name": "setAnswer", "inputs": [{"name": "a", "type": "uint8"}]}
+        assert decoder._decode_function_call(calldata)["args"] == {"a": 42}
+
+        del decoder.function_signatures["0x12345678"]
+        assert decoder._decode_function_call(calldata)["functionName"] == "unknown"
+
+        # Entries are read-only, so they can't drift from the index decoding goes through
+        with pytest.raises(TypeError):
+            decoder.function_signatures["0x0ac3e318"]["name"] = "renamed"  # type: ignore[index]
+        assert decoder._decode_function_call(set_caps)["functionName"] == "setCaps"
+
+        decoder.function_signatures = {"0x12345678": {"name": "setAnswer", "inputs": [{"name": "a", "type": "uint8"}]}}
+        assert list(decoder.function_signatures) == ["0x12345678"]
+        assert decoder._decode_function_call(set_caps)["functionName"] == "unknown"
+        assert decoder._decode_function_call(calldata)["functionName"] == "setAnswer"
+        assert EVCBatchDecoder()._decode_function_call(set_caps)["functionName"] == "setCaps"
+
+    def test_signatures_indexed_by_selector_bytes(self, decoder: EVCBatchDecoder) -> None:
+        """Test that every signature is indexed by its raw 4-byte selector."""
+        assert len(decoder._sig_by_bytes) == len(decoder.function_signatures)
+
+        sig_info = decoder._sig_by_bytes[bytes.fromhex("0ac3e318")]
+        assert sig_info["name"] == "setCaps"
+        assert sig_info["selector"] == "0x0ac3e318"
+        assert sig_info["input_types"] == ("uint16", "uint16")
+        assert sig_info["fields"] == (("supplyCap", False, False), ("borrowCap", False, False))
+        assert decoder._sig_by_bytes[bytes.fromhex("7b0472f0")]["fields"][0] == ("newHookTarget", True, False)
+        assert sig_info["input_names"] == ("supplyCap", "borrowCap")
+        assert sig_info["needs_conversion"] is False
+        assert decoder._sig_by_bytes[bytes.fromhex("7b0472f0")]["needs_conversion"] is True
+
+    def test_argument_decoder_is_built_once_per_selector(self, decoder: EVCBatchDecoder) -> None:
+        """Test that the eth_abi decoder for a selector is built on first use and then reused."""
+        sig_info = decoder._sig_by_bytes[bytes.fromhex("0ac3e318")]
+        calldata = bytes.fromhex("0ac3e318" + "64".rjust(64, "0") + "3c".rjust(64, "0"))
+        assert sig_info["decoder"] is None
+
+        first = decoder._decode_function_call(calldata)
+        tuple_decoder = sig_info["decoder"]
+        second = decoder._decode_function_call(calldata)
+
+        assert tuple_decoder is not None
+        assert sig_info["decoder"] is tuple_decoder
+        assert first == second
+        assert first is not None and first["args"] == {"supplyCap": 100, "borrowCap": 60}
+
     def test_load_chain_config(self, decoder: EVCBatchDecoder) -> None:
         """Test chain configuration loading."""
         config = decoder._load_chain_config()
@@ -95,6 +183,23 @@ class TestEVCBatchDecoder:
         name = decoder.get_contract_name(test_address)
         assert name == test_address
 
+    def test_get_contract_name_follows_metadata_and_chain(self, decoder: EVCBatchDecoder) -> None:
+        """Test that names follow metadata and chain changes, including direct edits to the attributes."""
+        mainnet_evc = "0x0C9a3dd6b8F28529d72d7f9cE918D493519EE383"
+        assert decoder.get_contract_name(mainnet_evc) == "0x0C9a...9EE383"
+
+        decoder.set_chain(1)
+        assert decoder.get_contract_name(mainnet_evc) == "EVC evc"
+
+        decoder.chain_config["addresses"]["renamed"] = decoder.chain_config["addresses"].pop("evc")
+        assert decoder.get_contract_name(mainnet_evc) == "EVC renamed"
+
+        decoder.add_contract_metadata(mainnet_evc, {"name": "Mainnet EVC"})
+        assert decoder.get_contract_name(mainnet_evc) == "Mainnet EVC"
+
+        decoder.metadata[mainnet_evc.lower()] = {"name": "Edited EVC"}
+        assert decoder.get_contract_name(mainnet_evc) == "Edited EVC"
+
     def test_get_contract_link(self, decoder: EVCBatchDecoder) -> None:
         """Test getting contract link."""
         test_address = "0x1234567890123456789012345678901234567890"
@@ -239,6 +344,7 @@ class TestEVCBatchDecoder:
         assert addresses[0].lower() in decoder.metadata
         assert "EVK Vault" in decoder.metadata[addresses[0].lower()]["name"]
 
+    @pytest.mark.slow
     @patch("evc_batch_decoder.decoder.console")
     def test_fetch_vault_metadata_with_web3_multicall_success(
         self, mock_console, decoder: EVCBatchDecoder, mock_web3: Mock
@@ -249,38 +355,23 @@ class TestEVCBatchDecoder:
         # Mock multicall contract and response
         mock_contract = Mock()
         mock_web3.eth.contract.return_value = mock_contract
-        mock_web3.to_checksum_address.side_effect = lambda x: x
-
-        # Mock successful multicall response
         mock_contract.functions.aggregate3.return_value.call.return_value = [
-            (
-                True,
-                (
-                    b"\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00"
-                    b"\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x20"
-                    b"\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00"
-                    b"\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x0b"
-                    b"Test Vault"
-                ),
-            ),
-            (
-                True,
-                b"\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x12\x34\x56\x78\x90\x12\x34\x56\x78\x90\x12\x34\x56\x78\x90\x12\x34\x56\x78\x90",
-            ),
+            (True, VAULT_NAME_RESULT),
+            (True, VAULT_ASSET_RESULT),
         ]
 
         decoder.fetch_vault_metadata(addresses, mock_web3)
 
         # Should have added metadata
-        assert addresses[0].lower() in decoder.metadata
+        assert decoder.metadata[addresses[0].lower()]["name"] == "Test Vault"
 
+    @pytest.mark.slow
     def test_fetch_vault_metadata_with_web3_multicall_failure(self, decoder: EVCBatchDecoder, mock_web3: Mock) -> None:
         """Test fetching vault metadata with web3 client (multicall failure)."""
         addresses = ["0x1234567890123456789012345678901234567890"]
 
         # Mock multicall failure
         mock_web3.eth.contract.side_effect = Exception("Multicall failed")
-        mock_web3.to_checksum_address.side_effect = lambda x: x
 
         decoder.fetch_vault_metadata(addresses, mock_web3)
 
@@ -288,6 +379,35 @@ class TestEVCBatchDecoder:
         assert addresses[0].lower() in decoder.metadata
         assert "EVK Vault" in decoder.metadata[addresses[0].lower()]["name"]
 
+    @pytest.mark.slow
+    def test_multicall_contract_is_cached_per_client(self, decoder: EVCBatchDecoder, mock_web3: Mock) -> None:
+        """Test that the Multicall3 contract is built once per Web3 client."""
+        addresses = ["0x1234567890123456789012345678901234567890"]
+        mock_web3.eth.contract.return_value.functions.aggregate3.return_value.call.return_value = []
+
+        decoder.fetch_vault_metadata(addresses, mock_web3)
+        decoder.fetch_vault_metadata(addresses, mock_web3)
+        assert mock_web3.eth.contract.call_count == 1
+
+        other_web3 = _make_mock_web3()
+        other_web3.eth.contract.return_value.functions.aggregate3.return_value.call.return_value = []
+        decoder.fetch_vault_metadata(addresses, other_web3)
+        assert other_web3.eth.contract.call_count == 1
+
+    def test_checksum_address_is_memoized(self, decoder: EVCBatchDecoder) -> None:
+        """Test that each address is checksummed only once per decoder."""
+        address = "0xca11bde05977b3631167028862be2a173976ca11"
+
+        with patch(
+            "evc_batch_decoder.decoder.to_checksum_address",
+            return_value="0xcA11bde05977b3631167028862bE2a173976CA11",
+        ) as mock_checksum:
+            first = decoder._to_checksum_address(address)
+            second = decoder._to_checksum_address(address)
+
+        assert first == second == "0xcA11bde05977b3631167028862bE2a173976CA11"
+        mock_checksum.assert_called_once_with(address)
+
     def test_fetch_router_metadata(self, decoder: EVCBatchDecoder) -> None:
         """Test fetching router metadata."""
         addresses = ["0x1234567890123456789012345678901234567890"]
@@ -375,6 +495,121 @@ class TestEVCBatchDecoder:
         assert analysis["governance_operations"][0]["function"] == "govSetConfig"
         assert len(analysis["router_changes"]) == 1
 
+    def test_governance_functions_drive_analysis_and_item_lines(self, decoder: EVCBatchDecoder) -> None:
+        """Test that customising governance_functions changes both the analysis and the highlighting."""
+        target = "0x1234567890123456789012345678901234567890"
+        batch = BatchDecoding(
+            items=[
+                BatchItem(target_contract=target, data="0x", decoded={"functionName": "setCaps", "args": {}}),
+                BatchItem(target_contract=target, data="0x", decoded={"functionName": "pause", "args": {}}),
+            ]
+        )
+        decoder.governance_functions.discard("setCaps")
+        decoder.governance_functions.add("pause")
+
+        analysis = decoder.analyze_batch(batch)
+
+        assert [op["function"] for op in analysis["governance_operations"]] == ["pause"]
+        # A custom governance function has no vault or router category to report changes under
+        assert analysis["vault_changes"] == {}
+        assert analysis["router_changes"] == {}
+        function_styles = {
+            value: style for _, label, value, style in decoder._item_lines(batch) if label == "Function:"
+        }
+        assert function_styles == {"setCaps": "yellow", "pause": "green"}
+        # Other decoders keep the default set
+        assert "setCaps" in EVCBatchDecoder().governance_functions
+
+    @pytest.mark.slow
+    def test_analyze_batch_fetches_metadata_in_one_multicall(self, decoder: EVCBatchDecoder, mock_web3: Mock) -> None:
+        """Test that vaults, routers and oracles cost a single aggregate3 round trip."""
+        vault = "0x1111111111111111111111111111111111111111"
+        router = "0x2222222222222222222222222222222222222222"
+        oracle = "0x3333333333333333333333333333333333333333"
+        batch = BatchDecoding(
+            items=[
+                BatchItem(target_contract=vault, data="0x0ac3e318", decoded={"functionName": "setCaps", "args": {}}),
+                BatchItem(
+                    target_contract=router,
+                    data="0x2c4e0a11",
+                    decoded={"functionName": "govSetConfig", "args": {"oracle": oracle}},
+                ),
+            ]
+        )
+        aggregate3 = mock_web3.eth.contract.return_value.functions.aggregate3
+        aggregate3.return_value.call.return_value = [(False, b""), (False, b"")]
+
+        decoder.analyze_batch(batch, mock_web3)
+
+        aggregate3.return_value.call.assert_called_once()
+        assert decoder.metadata[router]["type"] == "router"
+        assert decoder.metadata[oracle]["type"] == "oracle"
+
+    @pytest.mark.slow
+    def test_analyze_batch_with_async_web3(self, decoder: EVCBatchDecoder) -> None:
+        """Test that an AsyncWeb3 client fetches vault metadata through the awaitable multicall."""
+        from web3 import AsyncWeb3
+
+        vault = "0x1111111111111111111111111111111111111111"
+        batch = BatchDecoding(
+            items=[BatchItem(target_contract=vault, data="0x", decoded={"functionName": "setCaps", "args": {}})]
+        )
+        async_web3 = Mock(spec=AsyncWeb3)
+        async_web3.eth = Mock()
+        aggregate3 = async_web3.eth.contract.return_value.functions.aggregate3
+        aggregate3.return_value.call = AsyncMock(
+            return_value=[(True, eth_abi.encode(["string"], ["USDC Vault"])), (False, b"")]
+        )
+
+        decoder.analyze_batch(batch, async_web3)
+
+        aggregate3.return_value.call.assert_awaited_once()
+        assert decoder.metadata[vault]["name"] == "USDC Vault"
+
+    @pytest.mark.slow
+    async def test_aanalyze_batch_awaits_metadata_inside_event_loop(self, decoder: EVCBatchDecoder) -> None:
+        """Test that aanalyze_batch awaits the multicall, while analyze_batch refuses to run inside the loop."""
+        from web3 import AsyncWeb3
+
+        vault = "0x1111111111111111111111111111111111111111"
+        batch = BatchDecoding(
+            items=[BatchItem(target_contract=vault, data="0x", decoded={"functionName": "setCaps", "args": {}})]
+        )
+        async_web3 = Mock(spec=AsyncWeb3)
+        async_web3.eth = Mock()
+        aggregate3 = async_web3.eth.contract.return_value.functions.aggregate3
+        aggregate3.return_value.call = AsyncMock(
+            return_value=[(True, eth_abi.encode(["string"], ["USDC Vault"])), (False, b"")]
+        )
+
+        with pytest.raises(TypeError, match="await aanalyze_batch"):
+            decoder.analyze_batch(batch, async_web3)
+
+        analysis = await decoder.aanalyze_batch(batch, async_web3)
+        await decoder.aanalyze_batch(batch, async_web3)
+
+        assert [op["function"] for op in analysis["governance_operations"]] == ["setCaps"]
+        assert decoder.metadata[vault]["name"] == "USDC Vault"
+        assert aggregate3.return_value.call.await_count == 2
+        async_web3.eth.contract.assert_called_once()
+
+    def test_analyze_batch_dedupes_addresses_case_insensitively(self, decoder: EVCBatchDecoder) -> None:
+        """Test that differently-cased spellings of one vault are fetched once, in batch order."""
+        first = "0xcA11bde05977b3631167028862bE2a173976CA11"
+        second = "0x1111111111111111111111111111111111111111"
+        batch = BatchDecoding(
+            items=[
+                BatchItem(target_contract=first, data="0x", decoded={"functionName": "setCaps", "args": {}}),
+                BatchItem(target_contract=second, data="0x", decoded={"functionName": "setLTV", "args": {}}),
+                BatchItem(target_contract=first.lower(), data="0x", decoded={"functionName": "setLTV", "args": {}}),
+            ]
+        )
+
+        with patch.object(decoder, "fetch_vault_metadata") as mock_fetch:
+            decoder.analyze_batch(batch)
+
+        mock_fetch.assert_called_once_with([first, second], None)
+
     def test_analyze_batch_unknown_operations(self, decoder: EVCBatchDecoder) -> None:
         """Test analyzing batch with unknown operations."""
         batch = BatchDecoding(
@@ -497,3 +732,10 @@ class TestDataClasses:
         assert len(decoding.items) == 1
         assert decoding.timelock_info is not None
         assert decoding.timelock_info.delay == 3600
+
+    def test_data_classes_are_slotted(self) -> None:
+        """Test that the result data classes carry no per-instance __dict__."""
+        items = [BatchItem(target_contract="0x123", data="0xabcd")]
+
+        for instance in (items[0], TimelockInfo(delay=3600), BatchDecoding(items=items)):
+            assert not hasattr(instance, "__dict__")
@@ -2,32 +2,41 @@
 
 from __future__ import annotations
 
+import sys
 from unittest.mock import Mock, patch
 
+import eth_abi
 import pytest
-from eth_abi.exceptions import InsufficientDataBytes
+from eth_abi.exceptions import InsufficientDataBytes, InvalidPointer, NonEmptyPaddingBytes
 
 from evc_batch_decoder.decoder import BatchDecoding, BatchItem, EVCBatchDecoder
 
+BATCH_ITEMS_TYPE = "(address,address,uint256,bytes)[]"
+BATCH_SELECTOR = bytes.fromhex("72e94bf6")
+TARGET = "0x1111111111111111111111111111111111111111"
+SET_CAPS_CALLDATA = bytes.fromhex("0ac3e318") + eth_abi.encode(["uint16", "uint16"], [100, 60])
 
-@pytest.fixture
-def decoder() -> EVCBatchDecoder:
-    """Create a decoder instance for testing."""
-    return EVCBatchDecoder()
+
+def _batch_calldata(entries: list[tuple[str, str, int, bytes]]) -> bytes:
+    """Encode a call to batch() with the given (target, onBehalfOf, value, data) entries."""
+    return BATCH_SELECTOR + eth_abi.encode([BATCH_ITEMS_TYPE], [entries])
 
 
 class TestDecoderEdgeCases:
     """Test edge cases in the decoder for full coverage."""
 
+    @pytest.mark.slow
     def test_fetch_vault_metadata_multicall_decode_error(self, decoder: EVCBatchDecoder) -> None:
         """Test vault metadata fetching with multicall decode error."""
         addresses = ["0x1234567890123456789012345678901234567890"]
-        mock_web3 = Mock()
+        from web3 import Web3
+
+        mock_web3 = Mock(spec=Web3)
+        mock_web3.eth = Mock()
 
         # Mock successful multicall but decode failure
         mock_contract = Mock()
         mock_web3.eth.contract.return_value = mock_contract
-        mock_web3.to_checksum_address.side_effect = lambda x: x
 
         # Mock successful multicall response but invalid decode data
         mock_contract.functions.aggregate3.return_value.call.return_value = [
@@ -40,15 +49,18 @@ class TestDecoderEdgeCases:
         # Should still add metadata (fallback to generic name)
         assert addresses[0].lower() in decoder.metadata
 
+    @pytest.mark.slow
     def test_fetch_vault_metadata_multicall_failed_response(self, decoder: EVCBatchDecoder) -> None:
         """Test vault metadata fetching with failed multicall response."""
         addresses = ["0x1234567890123456789012345678901234567890"]
-        mock_web3 = Mock()
+        from web3 import Web3
+
+        mock_web3 = Mock(spec=Web3)
+        mock_web3.eth = Mock()
 
         # Mock successful multicall but failed response
         mock_contract = Mock()
         mock_web3.eth.contract.return_value = mock_contract
-        mock_web3.to_checksum_address.side_effect = lambda x: x
 
         # Mock failed multicall response
         mock_contract.functions.aggregate3.return_value.call.return_value = [
@@ -236,7 +248,7 @@ class TestDecoderEdgeCases:
         # Should handle items without decoded info (raw data branch)
         decoder.format_output(batch, analysis)
 
-    @patch("evc_batch_decoder.decoder.console")
+    @patch("evc_batch_decoder.decoder.err_console")
     def test_fetch_metadata_with_warning_output(self, mock_console, decoder: EVCBatchDecoder) -> None:
         """Test metadata fetching that produces console warnings."""
         # Test the warning output branches in metadata fetching
@@ -249,3 +261,201 @@ class TestDecoderEdgeCases:
 
         # Should have called console.print with warnings
         assert mock_console.print.call_count >= 3
+
+    @patch("evc_batch_decoder.decoder.err_console")
+    def test_decode_nested_batch_without_warnings(self, mock_console, decoder: EVCBatchDecoder) -> None:
+        """Test that a nested batch is decoded once, without a failed decode of its arguments."""
+        inner = _batch_calldata([(TARGET, TARGET, 0, SET_CAPS_CALLDATA)])
+        outer = _batch_calldata([(TARGET, TARGET, 0, inner)])
+
+        result = decoder.decode_batch_data(outer)
+
+        batch_item = result.items[0]
+        assert batch_item.decoded == {"functionName": "batch", "selector": "0x72e94bf6", "args": {}}
+        assert batch_item.nested_batch is not None
+        assert batch_item.nested_batch.items[0].decoded is not None
+        assert batch_item.nested_batch.items[0].decoded["args"] == {"supplyCap": 100, "borrowCap": 60}
+        mock_console.print.assert_not_called()
+
+    def test_unknown_batch_item_reuses_hex_data(self, decoder: EVCBatchDecoder) -> None:
+        """Test that an unknown call's raw_data matches the item's hex data."""
+        unknown_call = bytes.fromhex("deadbeef") + bytes(32)
+        batch = _batch_calldata([(TARGET, TARGET, 0, unknown_call)])
+
+        item = decoder.decode_batch_data(batch).items[0]
+
+        assert item.data == unknown_call.hex()
+        assert item.decoded is not None
+        assert item.decoded["raw_data"] == item.data
+
+    def test_format_output_plain_when_not_a_terminal(self, decoder: EVCBatchDecoder, capsys) -> None:
+        """Test that non-terminal output is plain text with no Rich rendering."""
+        batch = BatchDecoding(
+            items=[
+                BatchItem(
+                    target_contract="0x1234567890123456789012345678901234567890",
+                    data="0x0ac3e318",
+                    decoded={"functionName": "setCaps", "args": {"supplyCap": 100}},
+                )
+            ]
+        )
+        analysis = decoder.analyze_batch(batch)
+
+        with patch("evc_batch_decoder.decoder.console") as mock_console:
+            mock_console.is_terminal = False
+            decoder.format_output(batch, analysis)
+
+        mock_console.print.assert_not_called()
+        output = capsys.readouterr().out
+        assert "EVC Batch Decoder Results" in output
+        assert "  Total Items: 1" in output
+        assert "    Function: setCaps" in output
+        assert "    • setCaps(supplyCap=100)" in output
+        assert "[" not in output
+
+    @patch("evc_batch_decoder.decoder.err_console")
+    def test_quiet_decoder_suppresses_warnings(self, mock_console) -> None:
+        """Test that a quiet decoder doesn't print warnings."""
+        decoder = EVCBatchDecoder(quiet=True)
+
+        decoder.fetch_vault_metadata(["0x1234567890123456789012345678901234567890"], None)
+
+        mock_console.print.assert_not_called()
+        assert "0x1234567890123456789012345678901234567890" in decoder.metadata
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_decode_batch_data_json_string_parsers(self, decoder: EVCBatchDecoder, use_orjson: bool) -> None:
+        """Test JSON string input with and without orjson, including values orjson can't parse."""
+        data = '{"data": "0x0ac3e318' + "64".rjust(64, "0") + "3c".rjust(64, "0") + '", "nonce": ' + "9" * 30 + "}"
+
+        if not use_orjson:
+            with patch("evc_batch_decoder._json.get_orjson", return_value=None):
+                result = decoder.decode_batch_data(data)
+        else:
+            result = decoder.decode_batch_data(data)
+
+        assert result.items[0].decoded is not None
+        assert result.items[0].decoded["args"] == {"supplyCap": 100, "borrowCap": 60}
+
+    def test_unknown_operation_data_length_counts_bytes(self, decoder: EVCBatchDecoder) -> None:
+        """Test that data_length is the payload size in bytes whether or not the hex has a 0x prefix."""
+        batch = BatchDecoding(
+            items=[
+                BatchItem(
+                    target_contract="0x1234567890123456789012345678901234567890",
+                    data=prefix + "12345678abcd",
+                    decoded={"functionName": "unknown", "selector": "0x12345678", "args": {}},
+                )
+                for prefix in ("0x", "")
+            ]
+        )
+
+        analysis = decoder.analyze_batch(batch)
+
+        assert [op["data_length"] for op in analysis["unknown_operations"]] == [6, 6]
+
+    def test_format_output_terminal_change_sections(self, decoder: EVCBatchDecoder) -> None:
+        """Test that the terminal report lists every configuration change and unknown operation."""
+        from rich.console import Console
+
+        vault = "0x1234567890123456789012345678901234567890"
+        batch = BatchDecoding(
+            items=[
+                BatchItem(
+                    target_contract=vault,
+                    data="0x0ac3e318",
+                    decoded={"functionName": "setCaps", "args": {"supplyCap": 100, "borrowCap": 60}},
+                ),
+                BatchItem(
+                    target_contract=vault,
+                    data="0x12345678abcd",
+                    decoded={"functionName": "unknown", "selector": "0x12345678", "args": {}},
+                ),
+            ]
+        )
+        analysis = decoder.analyze_batch(batch)
+        recording_console = Console(record=True, force_terminal=True, width=200)
+
+        with patch("evc_batch_decoder.decoder.console", recording_console):
+            decoder.format_output(batch, analysis)
+
+        output = recording_console.export_text()
+        assert f"Vault Changes:\n  {vault}:\n    • setCaps(supplyCap=100, borrowCap=60)\n" in output
+        assert f"  Item 1: 0x12345678 → {vault} (6 bytes)\n" in output
+
+    def test_batch_items_match_eth_abi_decoding(self, decoder: EVCBatchDecoder) -> None:
+        """Test that the batch argument is read exactly as eth_abi decodes it."""
+        entries = [
+            ("0x1234567890AbcdEF1234567890aBcdef12345678", "0x1111111111111111111111111111111111111111", 0, b""),
+            (
+                "0x2222222222222222222222222222222222222222",
+                "0x3333333333333333333333333333333333333333",
+                10**30,
+                b"\xab" * 37,
+            ),
+        ]
+        batch = _batch_calldata(entries)
+
+        items = decoder.decode_batch_data(batch).items
+
+        expected = eth_abi.decode([BATCH_ITEMS_TYPE], batch[4:])[0]
+        assert [(i.target_contract, i.on_behalf_of, i.value, i.data) for i in items] == [
+            (target, on_behalf_of, value, data.hex()) for target, on_behalf_of, value, data in expected
+        ]
+
+        def with_word(offset: int, word: int) -> bytes:
+            """Replace the 32-byte word at ``offset`` (relative to the arguments) in the batch."""
+            offset += len(BATCH_SELECTOR)
+            return batch[:offset] + word.to_bytes(32, "big") + batch[offset + 32 :]
+
+        # Non-canonical encodings are rejected the same way eth_abi rejects them. The arguments are
+        # the array offset, its length, two item offsets, then the first item's four head words
+        cases = [
+            (batch[:-1] + b"\x01", NonEmptyPaddingBytes),
+            (batch[:-1], InsufficientDataBytes),
+            (with_word(0, 0), InvalidPointer),  # array offset pointing at itself
+            (with_word(64, 0), InvalidPointer),  # item offset pointing into the item offsets
+            (with_word(96, 0x20), InvalidPointer),  # second item overlapping the first one's offset
+            (with_word(128 + 96, 0x60), InvalidPointer),  # bytes offset pointing into the item head
+            (with_word(0, len(batch)), InvalidPointer),  # array offset past the end
+        ]
+        for malformed, error in cases:
+            with pytest.raises(error):
+                eth_abi.decode([BATCH_ITEMS_TYPE], malformed[4:])
+            with pytest.raises(error):
+                decoder.decode_batch_data(malformed)
+
+    def test_truncated_batch_raises_insufficient_data(self, decoder: EVCBatchDecoder) -> None:
+        """Test that batch data cut short raises eth_abi's InsufficientDataBytes."""
+        batch = _batch_calldata([(TARGET, TARGET, 0, b"\x01" * 40)])
+
+        with pytest.raises(InsufficientDataBytes):
+            decoder.decode_batch_data(batch[:-40])
+
+    def test_deeply_nested_batch_decodes_without_recursion(self, decoder: EVCBatchDecoder) -> None:
+        """Test that batches nested deeper than the recursion limit still decode."""
+        # A fixed depth with the limit pinned just above the current stack: the limit itself varies
+        # (py_ecc, imported with web3, raises it to 100000) and payloads grow with every level
+        depth = 200
+        calldata = SET_CAPS_CALLDATA
+        for _ in range(depth):
+            calldata = _batch_calldata([(TARGET, TARGET, 0, calldata)])
+
+        stack_depth = 0
+        frame = sys._getframe()
+        while frame is not None:
+            stack_depth += 1
+            frame = frame.f_back
+        limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(stack_depth + depth // 2)
+        try:
+            batch = decoder.decode_batch_data(calldata)
+        finally:
+            sys.setrecursionlimit(limit)
+
+        for _ in range(depth - 1):
+            assert batch.items[0].nested_batch is not None
+            batch = batch.items[0].nested_batch
+
+        assert batch.items[0].decoded is not None
+        assert batch.items[0].decoded["args"] == {"supplyCap": 100, "borrowCap": 60}
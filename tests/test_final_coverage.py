@@ -2,65 +2,28 @@
 
 from __future__ import annotations
 
-import tempfile
-from unittest.mock import Mock, patch
+from pathlib import Path
+from unittest.mock import patch
 
-import pytest
 from click.testing import CliRunner
 
 from evc_batch_decoder.cli import decode_batch
 from evc_batch_decoder.decoder import EVCBatchDecoder
 
 
-@pytest.fixture
-def runner() -> CliRunner:
-    """Create a CLI runner for testing."""
-    return CliRunner()
-
-
-@pytest.fixture
-def decoder() -> EVCBatchDecoder:
-    """Create a decoder instance for testing."""
-    return EVCBatchDecoder()
-
-
-def test_cli_tx_hash_web3_not_initialized(runner: CliRunner) -> None:
-    """Test CLI tx-hash path where web3 client is None."""
-    with patch("evc_batch_decoder.cli.Web3") as mock_web3:
-        # Mock Web3 constructor to succeed but set w3_client to None in some other way
-        mock_web3.return_value = Mock()
-
-        # We need to test the path where w3_client is None after creation
-        with patch("evc_batch_decoder.cli.decode_batch") as mock_decode:
-            # Create a custom side effect to test the None check
-            def side_effect(*args, **kwargs):
-                # This is a simplified reproduction of the CLI logic
-                w3_client = None  # Simulate w3_client being None
-                if w3_client is None:
-                    print("Error: Web3 client not initialized")
-                    return Mock(exit_code=1, output="Error: Web3 client not initialized")
-
-            mock_decode.side_effect = side_effect
-
-        result = runner.invoke(decode_batch, ["--tx-hash", "0xabc123", "--rpc-url", "https://eth.llamarpc.com"])
-
-        # Should handle the case where web3 client initialization fails
-
-
-def test_cli_file_processing_exceptions(runner: CliRunner) -> None:
+def test_cli_file_processing_exceptions(runner: CliRunner, tmp_path: Path) -> None:
     """Test CLI file processing with various exception conditions."""
     # Test with a file that has a complex JSON structure to hit more code paths
-    with tempfile.NamedTemporaryFile(mode="w", delete=False, suffix=".json") as f:
-        f.write(
-            (
-                '{"data": "0x0ac3e318'
-                "0000000000000000000000000000000000000000000000000000000000000064"
-                '000000000000000000000000000000000000000000000000000000000000003c", "extra": "value"}'
-            )
+    temp_file = tmp_path / "input.json"
+    temp_file.write_text(
+        (
+            '{"data": "0x0ac3e318'
+            "0000000000000000000000000000000000000000000000000000000000000064"
+            '000000000000000000000000000000000000000000000000000000000000003c", "extra": "value"}'
         )
-        temp_file = f.name
+    )
 
-    result = runner.invoke(decode_batch, ["--file", temp_file])
+    result = runner.invoke(decode_batch, ["--file", str(temp_file)])
     # Should process the file successfully and extract the data field
     assert result.exit_code == 0
 
@@ -74,20 +37,6 @@ def test_cli_debug_path_with_valid_data(runner: CliRunner) -> None:
     # This tests the traceback.format_exc() line
 
 
-def test_decoder_import_error_simulation() -> None:
-    """Test the import error handling in decoder module."""
-    # This tests the except ImportError block in the try/except
-    # We can't easily simulate this in runtime, but we can verify the structure
-    import evc_batch_decoder.decoder as decoder_module
-
-    # Verify that the required modules are imported
-    assert hasattr(decoder_module, "console")
-    assert hasattr(decoder_module, "EVCBatchDecoder")
-
-    # The import error handling is at module level, so this test
-    # verifies the structure is correct
-
-
 def test_decoder_address_bytes_conversion_edge_case(decoder: EVCBatchDecoder) -> None:
     """Test edge case in address handling."""
     # Test get_contract_name with various address formats
@@ -139,6 +88,12 @@ def test_decoder_nested_batch_analysis_recursive_call(decoder: EVCBatchDecoder)
     analysis = decoder.analyze_batch(outer_batch)
     assert analysis["nested_batches"] >= 1  # At least one nested batch should be found
 
+    # The innermost operation is found, and its vault metadata is fetched only once
+    with patch.object(decoder, "fetch_vault_metadata") as mock_fetch:
+        analysis = decoder.analyze_batch(outer_batch)
+    assert [op["function"] for op in analysis["governance_operations"]] == ["setCaps"]
+    mock_fetch.assert_called_once_with(["0x1111111111111111111111111111111111111111"], None)
+
 
 def test_decoder_format_readme_caps_edge_values(decoder: EVCBatchDecoder) -> None:
     """Test README formatting with specific cap values that trigger edge cases."""
@@ -5,6 +5,10 @@ from __future__ import annotations
 import subprocess
 import sys
 
+import pytest
+
+pytestmark = pytest.mark.slow
+
 
 def test_main_module_execution() -> None:
     """Test that the main module can be executed."""
@@ -15,3 +19,37 @@ def test_main_module_execution() -> None:
 
     assert result.returncode == 0
     assert "Decode EVC batch transaction data" in result.stdout
+
+
+def test_help_does_not_import_heavy_dependencies() -> None:
+    """Test that --help stays fast by not importing web3, rich or the decoder."""
+    script = (
+        "import sys\n"
+        "from evc_batch_decoder.cli import decode_batch\n"
+        "try:\n"
+        "    decode_batch(['--help'])\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "loaded = [name for name in ('web3', 'rich', 'evc_batch_decoder.decoder') if name in sys.modules]\n"
+        "print('LOADED:', loaded)\n"
+    )
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", script], capture_output=True, text=True, check=False
+    )
+
+    assert "LOADED: []" in result.stdout
+
+
+def test_decoder_import_does_not_import_web3() -> None:
+    """Test that importing the decoder as a library doesn't pay for importing web3 or Rich's console."""
+    script = (
+        "import sys\n"
+        "import evc_batch_decoder.decoder\n"
+        "loaded = [name for name in ('web3', 'rich.console', 'rich.table', 'asyncio') if name in sys.modules]\n"
+        "print('LOADED:', loaded)\n"
+    )
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", script], capture_output=True, text=True, check=False
+    )
+
+    assert "LOADED: []" in result.stdout
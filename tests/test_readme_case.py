@@ -108,3 +108,11 @@ def test_readme_case(batch_data_setcaps: str, decoder: EVCBatchDecoder, test_met
     readme_output = decoder.format_readme_style(result, analysis)
     assert readme_output  # Should produce some output
     assert "Changes:" in readme_output  # Should contain expected sections
+
+
+def test_readme_case_from_raw_bytes(batch_data_setcaps: str, decoder: EVCBatchDecoder) -> None:
+    """Test that raw calldata bytes decode the same as the hex string."""
+    from_hex = decoder.decode_batch_data(batch_data_setcaps)
+    from_bytes = decoder.decode_batch_data(bytes.fromhex(batch_data_setcaps[2:]))
+
+    assert from_bytes == from_hex